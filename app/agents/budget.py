@@ -0,0 +1,68 @@
+# app/agents/budget.py
+import time
+from typing import TypedDict, Optional
+
+from langchain_core.messages import BaseMessage
+
+from app.core.config import get_settings
+
+
+class RunBudget(TypedDict):
+    """
+    Execution budget of one agent run, carried in AgentState.
+    Limits are fixed at the start of the run; counters grow as it goes.
+    """
+    max_tool_hops: int
+    deadline: float  # time.time() after which no more tools are called
+    max_tokens: int  # prompt + completion tokens over all LLM calls
+    tool_hops: int
+    tokens_used: int
+
+
+def new_budget(
+    max_tool_hops: Optional[int] = None,
+    deadline_seconds: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+) -> RunBudget:
+    """
+    Budget for a new run; unset limits fall back to Settings.
+    """
+    settings = get_settings()
+    if max_tool_hops is None:
+        max_tool_hops = settings.agent_max_tool_hops
+    if deadline_seconds is None:
+        deadline_seconds = settings.agent_deadline_seconds
+    if max_tokens is None:
+        max_tokens = settings.agent_max_tokens
+
+    return {
+        "max_tool_hops": max_tool_hops,
+        "deadline": time.time() + deadline_seconds,
+        "max_tokens": max_tokens,
+        "tool_hops": 0,
+        "tokens_used": 0,
+    }
+
+
+def charge_tokens(budget: RunBudget, message: BaseMessage) -> RunBudget:
+    usage = getattr(message, "usage_metadata", None) or {}
+    return {**budget, "tokens_used": budget["tokens_used"] + usage.get("total_tokens", 0)}
+
+
+def charge_tool_hop(budget: RunBudget) -> RunBudget:
+    return {**budget, "tool_hops": budget["tool_hops"] + 1}
+
+
+def exhausted_reason(budget: Optional[RunBudget]) -> Optional[str]:
+    """
+    Why the run may not call more tools, or None while within budget.
+    """
+    if not budget:
+        return None
+    if budget["tool_hops"] >= budget["max_tool_hops"]:
+        return f"tool hop limit reached ({budget['max_tool_hops']})"
+    if budget["tokens_used"] >= budget["max_tokens"]:
+        return f"token limit reached ({budget['tokens_used']}/{budget['max_tokens']})"
+    if time.time() >= budget["deadline"]:
+        return "time limit reached"
+    return None
@@ -0,0 +1,275 @@
+# app/agents/checkpointer.py
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
+
+import ormsgpack
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+
+class RedisCheckpointSaver(BaseCheckpointSaver[int]):
+    """
+    Async LangGraph checkpointer on plain Redis (no modules required).
+
+    Layout per (thread, namespace):
+        ckpt:idx:{thread}:{ns}                 sorted set of checkpoint ids (lex order = time order)
+        ckpt:{thread}:{ns}:{id}                packed checkpoint, metadata, parent id
+        ckpt:writes:{thread}:{ns}:{id}         hash of pending writes
+        ckpt:blob:{thread}:{ns}:{channel}:{v}  channel values, stored once per version
+
+    Only the newest `keep` checkpoints of a thread (and the blobs they
+    reference) are retained, and every key carries a TTL that is refreshed
+    while the thread is active.
+    """
+
+    def __init__(self, client, *, ttl_seconds: int = 30 * 24 * 3600, keep: int = 20, serde=None):
+        super().__init__(serde=serde)
+        self.client = client  # redis.asyncio.Redis with decode_responses=False
+        self.ttl = ttl_seconds
+        self.keep = keep
+
+    # ---------- keys ----------
+
+    @staticmethod
+    def _index_key(thread_id: str, ns: str) -> str:
+        return f"ckpt:idx:{thread_id}:{ns}"
+
+    @staticmethod
+    def _checkpoint_key(thread_id: str, ns: str, checkpoint_id: str) -> str:
+        return f"ckpt:{thread_id}:{ns}:{checkpoint_id}"
+
+    @staticmethod
+    def _writes_key(thread_id: str, ns: str, checkpoint_id: str) -> str:
+        return f"ckpt:writes:{thread_id}:{ns}:{checkpoint_id}"
+
+    @staticmethod
+    def _blob_key(thread_id: str, ns: str, channel: str, version) -> str:
+        return f"ckpt:blob:{thread_id}:{ns}:{channel}:{version}"
+
+    # ---------- helpers ----------
+
+    @staticmethod
+    def _config(thread_id: str, ns: str, checkpoint_id: str) -> RunnableConfig:
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": ns,
+                "checkpoint_id": checkpoint_id,
+            }
+        }
+
+    async def _load_tuple(self, thread_id: str, ns: str, checkpoint_id: str) -> CheckpointTuple | None:
+        raw = await self.client.get(self._checkpoint_key(thread_id, ns, checkpoint_id))
+        if raw is None:
+            return None
+
+        c_type, c_bytes, m_type, m_bytes, parent_id = ormsgpack.unpackb(raw)
+        checkpoint: Checkpoint = self.serde.loads_typed((c_type, c_bytes))
+
+        # Channel values
+        versions = list(checkpoint["channel_versions"].items())
+        blobs = await self.client.mget(
+            [self._blob_key(thread_id, ns, channel, version) for channel, version in versions]
+        ) if versions else []
+
+        channel_values = {}
+        for (channel, _), blob in zip(versions, blobs):
+            if blob is None:
+                continue
+            b_type, b_bytes = ormsgpack.unpackb(blob)
+            if b_type != "empty":
+                channel_values[channel] = self.serde.loads_typed((b_type, b_bytes))
+
+        # Pending writes, in (task, idx) order
+        raw_writes = await self.client.hgetall(self._writes_key(thread_id, ns, checkpoint_id))
+        pending = sorted(ormsgpack.unpackb(v) for v in raw_writes.values())
+        pending_writes = [
+            (task_id, channel, self.serde.loads_typed((w_type, w_bytes)))
+            for task_id, _idx, channel, w_type, w_bytes, _path in pending
+        ]
+
+        return CheckpointTuple(
+            config=self._config(thread_id, ns, checkpoint_id),
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self.serde.loads_typed((m_type, m_bytes)),
+            parent_config=self._config(thread_id, ns, parent_id) if parent_id else None,
+            pending_writes=pending_writes,
+        )
+
+    async def _channel_versions(self, thread_id: str, ns: str, checkpoint_ids: list) -> list:
+        raw = await self.client.mget([self._checkpoint_key(thread_id, ns, c) for c in checkpoint_ids])
+        versions = []
+        for packed in raw:
+            if packed is None:
+                continue  # expired
+            c_type, c_bytes, *_ = ormsgpack.unpackb(packed)
+            versions.append(self.serde.loads_typed((c_type, c_bytes))["channel_versions"])
+        return versions
+
+    async def _prune(self, thread_id: str, ns: str):
+        index_key = self._index_key(thread_id, ns)
+
+        # Oldest retained checkpoint comes first, the pruned ones after it
+        ids = [raw_id.decode() for raw_id in await self.client.zrevrange(index_key, self.keep - 1, -1)]
+        if len(ids) < 2:
+            return
+        oldest_kept, stale = ids[0], ids[1:]
+
+        # Channel versions only grow, so a blob of a pruned checkpoint is
+        # still needed only if the oldest retained one references it
+        kept = await self._channel_versions(thread_id, ns, [oldest_kept])
+        kept = kept[0] if kept else {}
+        blobs = {
+            self._blob_key(thread_id, ns, channel, version)
+            for versions in await self._channel_versions(thread_id, ns, stale)
+            for channel, version in versions.items()
+            if kept.get(channel) != version
+        }
+
+        keys = list(blobs)
+        for checkpoint_id in stale:
+            keys.append(self._checkpoint_key(thread_id, ns, checkpoint_id))
+            keys.append(self._writes_key(thread_id, ns, checkpoint_id))
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.delete(*keys)
+        pipe.zrem(index_key, *stale)
+        await pipe.execute()
+
+    # ---------- BaseCheckpointSaver (async) ----------
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+
+        checkpoint_id = get_checkpoint_id(config)
+        if not checkpoint_id:
+            latest = await self.client.zrevrange(self._index_key(thread_id, ns), 0, 0)
+            if not latest:
+                return None
+            checkpoint_id = latest[0].decode()
+
+        return await self._load_tuple(thread_id, ns, checkpoint_id)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        if config is None:
+            raise ValueError("RedisCheckpointSaver.alist requires a thread_id")
+
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        only_id = get_checkpoint_id(config)
+        before_id = get_checkpoint_id(before) if before else None
+
+        ids = await self.client.zrevrange(self._index_key(thread_id, ns), 0, -1)
+        for raw_id in ids:
+            checkpoint_id = raw_id.decode()
+
+            if only_id and checkpoint_id != only_id:
+                continue
+            if before_id and checkpoint_id >= before_id:
+                continue
+
+            item = await self._load_tuple(thread_id, ns, checkpoint_id)
+            if item is None:
+                continue
+            if filter and not all(item.metadata.get(k) == v for k, v in filter.items()):
+                continue
+
+            if limit is not None:
+                if limit <= 0:
+                    break
+                limit -= 1
+
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+
+        c = checkpoint.copy()
+        values: dict[str, Any] = c.pop("channel_values")
+
+        pipe = self.client.pipeline(transaction=False)
+
+        for channel, version in new_versions.items():
+            blob = self.serde.dumps_typed(values[channel]) if channel in values else ("empty", b"")
+            pipe.set(self._blob_key(thread_id, ns, channel, version), ormsgpack.packb(list(blob)), ex=self.ttl)
+
+        # Unchanged channels are still referenced by this checkpoint
+        for channel, version in checkpoint["channel_versions"].items():
+            if channel not in new_versions:
+                pipe.expire(self._blob_key(thread_id, ns, channel, version), self.ttl)
+
+        c_type, c_bytes = self.serde.dumps_typed(c)
+        m_type, m_bytes = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        pipe.set(
+            self._checkpoint_key(thread_id, ns, checkpoint["id"]),
+            ormsgpack.packb([c_type, c_bytes, m_type, m_bytes, parent_id]),
+            ex=self.ttl,
+        )
+
+        index_key = self._index_key(thread_id, ns)
+        pipe.zadd(index_key, {checkpoint["id"]: 0})
+        pipe.expire(index_key, self.ttl)
+        await pipe.execute()
+
+        await self._prune(thread_id, ns)
+
+        return self._config(thread_id, ns, checkpoint["id"])
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        key = self._writes_key(thread_id, ns, checkpoint_id)
+
+        pipe = self.client.pipeline(transaction=False)
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            w_type, w_bytes = self.serde.dumps_typed(value)
+            packed = ormsgpack.packb([task_id, write_idx, channel, w_type, w_bytes, task_path])
+            field = f"{task_id}:{write_idx}"
+
+            # Special writes (errors, interrupts) overwrite; regular ones are idempotent
+            if write_idx < 0:
+                pipe.hset(key, field, packed)
+            else:
+                pipe.hsetnx(key, field, packed)
+        pipe.expire(key, self.ttl)
+        await pipe.execute()
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        async for key in self.client.scan_iter(match=f"ckpt:*{thread_id}:*"):
+            parts = key.decode().split(":")
+            # ckpt:<thread>:..., ckpt:idx|writes|blob:<thread>:...
+            if thread_id in (parts[1], parts[2]):
+                await self.client.delete(key)
@@ -0,0 +1,131 @@
+# app/agents/fast_path.py
+import re
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from app.tools.currency import CURRENCY_CODES
+from app.tools.registry import get_tool
+
+# Only real currency codes, so "10 lbs in kgs" is not a conversion
+_CURRENCY = "|".join(sorted(code.lower() for code in CURRENCY_CODES))
+
+# A word of a city name: not a time word, unit or filler, so "weather in
+# paris in fahrenheit" or "weather in delhi yesterday" go to the agents
+_NOT_CITY = (
+    "today|now|right|tonight|tomorrow|yesterday|week|weekend|forecast|currently|"
+    "like|me|here|there|outside|please|in|at|for|on|the|and|or|vs|"
+    "fahrenheit|celsius|degrees"
+)
+_CITY_WORD = rf"(?!(?:{_NOT_CITY})\b)[a-z][a-z.'-]*"
+
+
+@dataclass(frozen=True)
+class FastRoute:
+    """
+    A clearly single-tool request: if `pattern` matches the whole user
+    message, `tool` is called with `args(match)` and the answer is
+    rendered by `template(args, result)` without planner/executor/critic.
+    """
+    tool: str
+    pattern: re.Pattern
+    args: Callable[[re.Match], Dict[str, Any]]
+    template: Callable[[Dict[str, Any], Any], Optional[str]]
+
+
+def _datetime_template(args, result):
+    return f"The current date and time is {result['datetime']}."
+
+
+def _currency_template(args, result):
+    if not isinstance(result, (int, float)):
+        return None
+    return f"{args['amount']:g} {args['from_currency']} = {result:,.2f} {args['to_currency']}"
+
+
+def _weather_template(args, result):
+    return (
+        f"Current weather in {args['city']}: {result['weather_desc']}, "
+        f"{result['temp_C']}°C, humidity {result['humidity']}%."
+    )
+
+
+FAST_ROUTES = [
+    FastRoute(
+        tool="get_current_datetime",
+        pattern=re.compile(
+            r"(?:what(?:'s| is) )?(?:the )?(?:current |today'?s )?(?:time|date|date and time)"
+            r"(?: is it)?(?: (?:now|today|right now))?"
+            r"|what time is it(?: now| right now)?"
+        ),
+        args=lambda m: {},
+        template=_datetime_template,
+    ),
+    FastRoute(
+        tool="currency_convert",
+        pattern=re.compile(
+            rf"(?:convert |how much is )?(?P<amount>\d+(?:\.\d+)?) ?(?P<from>{_CURRENCY}) (?:to|in|into) (?P<to>{_CURRENCY})"
+        ),
+        args=lambda m: {
+            "amount": float(m["amount"]),
+            "from_currency": m["from"].upper(),
+            "to_currency": m["to"].upper(),
+        },
+        template=_currency_template,
+    ),
+    FastRoute(
+        tool="get_weather",
+        pattern=re.compile(
+            r"(?:what(?:'s| is) )?(?:the )?weather(?: like)? (?:in|for|at) "
+            rf"(?P<city>{_CITY_WORD}(?: {_CITY_WORD}){{0,4}})"
+            r"(?: (?:today|now|right now))?"
+        ),
+        args=lambda m: {"city": m["city"].strip().title()},
+        template=_weather_template,
+    ),
+]
+
+
+def _normalize(text: str) -> str:
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    return text.rstrip("?.! ")
+
+
+def match_fast_path(text: str) -> Optional[dict]:
+    """
+    Returns a synthetic tool call for a clearly single-tool request,
+    or None when the message needs the full agent pipeline.
+    """
+    normalized = _normalize(text)
+
+    for route in FAST_ROUTES:
+        if get_tool(route.tool) is None:
+            continue
+
+        match = route.pattern.fullmatch(normalized)
+        if match:
+            return {
+                "name": route.tool,
+                "args": route.args(match),
+                "id": f"fast_{uuid.uuid4().hex[:12]}",
+            }
+
+    return None
+
+
+def render_fast_answer(tool_call: dict, result: Any) -> Optional[str]:
+    """
+    Template answer for a fast-path tool result, or None when the result
+    is unusable (errors, unexpected shape) and an LLM should format it.
+    """
+    if isinstance(result, dict) and "error" in result:
+        return None
+
+    for route in FAST_ROUTES:
+        if route.tool == tool_call["name"]:
+            try:
+                return route.template(tool_call["args"], result)
+            except (KeyError, TypeError, ValueError):
+                return None
+
+    return None
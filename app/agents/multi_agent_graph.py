@@ -1,65 +1,217 @@
 # app/agents/multi_agent_graph.py
 
-import operator
+import asyncio
+import json
+from functools import lru_cache
+
+import xxhash
 from app.core.config import get_settings
-from typing import TypedDict, Annotated, List
+from typing import TypedDict, Annotated, List, NotRequired
 
 from langgraph.graph import StateGraph, START, END
-from langchain_groq import ChatGroq
-from langchain_core.messages import (BaseMessage, AIMessage, SystemMessage)
+from langgraph.graph.message import add_messages
+from langchain_core.messages import (BaseMessage, AIMessage, HumanMessage, SystemMessage)
 from langchain_core.messages import ToolMessage
-from app.tools.registry import TOOLS_REGISTRY
+from langchain_core.load import dumpd, load
+from app.tools.registry import describe_tools, get_tool, get_tools
+from app.agents.checkpointer import RedisCheckpointSaver
+from app.agents.fast_path import match_fast_path, render_fast_answer
+from app.agents.tool_output import compact_tool_output
+from app.agents.budget import (
+    RunBudget, charge_tokens, charge_tool_hop, exhausted_reason
+)
+from app.utils import metrics
+from app.core.deadline import deadline_scope
+from app.core.redis_client import get_async_redis_client, get_async_redis_raw_client
+from app.utils.singleflight import SingleFlight, redis_single_flight
 
-settings = get_settings()
 
-tools = list(TOOLS_REGISTRY.values())
+# 1. Define the shared LLM used by all agents (Groq), built on first use
+@lru_cache
+def get_llm():
+    from langchain_groq import ChatGroq  # slow import, deferred to first use
 
-# 1. Define the shared LLM used by all agents (Groq)
-llm = ChatGroq(
-    model="openai/gpt-oss-120b",
-    api_key=settings.groq_api_key,
-    temperature=0.2,
-).bind_tools(tools)
+    return ChatGroq(
+        model="openai/gpt-oss-120b",
+        api_key=get_settings().groq_api_key,
+        temperature=0.2,
+    ).bind_tools(list(get_tools().values()))
 
 
 class AgentState(TypedDict):
-    messages: Annotated[List[BaseMessage], operator.add]
-
-
-def tool_node(state: AgentState) -> AgentState:
+    # add_messages (vs. plain list concat) lets a turn drop old messages with RemoveMessage
+    messages: Annotated[List[BaseMessage], add_messages]
+    summary: NotRequired[str | None]  # rolling summary of turns outside the window
+    route: NotRequired[str]  # "fast" (single tool, no planner/critic) or "agent"
+    budget: NotRequired[RunBudget]  # per-run limits and usage, reset every turn
+
+
+def _context(state: AgentState) -> List[BaseMessage]:
+    """
+    Conversation as seen by the LLM: rolling summary (if any) + messages.
+    """
+    summary = state.get("summary")
+    if not summary:
+        return state["messages"]
+
+    return [
+        SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")
+    ] + state["messages"]
+
+
+def _charged(state: AgentState, result: BaseMessage) -> AgentState:
+    """
+    Node update for an LLM result, counting its tokens against the budget.
+    """
+    update = {"messages": [result]}
+    if state.get("budget"):
+        update["budget"] = charge_tokens(state["budget"], result)
+    return update
+
+
+# Identical prompts in flight at the same time share one LLM call: in-process
+# through futures, across workers through a Redis lock + short-lived result.
+_llm_flight = SingleFlight()
+LLM_RESULT_TTL_SECONDS = 10
+
+
+def _prompt_key(prompt: List[BaseMessage]) -> str:
+    # Message ids differ per thread, so only the semantic fields are hashed
+    canonical = [
+        [m.type, m.content, getattr(m, "tool_calls", None), getattr(m, "name", None)]
+        for m in prompt
+    ]
+    return "llm:" + xxhash.xxh3_128_hexdigest(json.dumps(canonical, sort_keys=True, default=str))
+
+
+async def _invoke_llm(prompt: List[BaseMessage]) -> BaseMessage:
+    key = _prompt_key(prompt)
+
+    async def read():
+        raw = await get_async_redis_client().get(key)
+        return load(json.loads(raw)) if raw else None
+
+    async def compute():
+        result = await get_llm().ainvoke(prompt)
+        await get_async_redis_client().set(key, json.dumps(dumpd(result)), ex=LLM_RESULT_TTL_SECONDS)
+        return result
+
+    return await _llm_flight.do(
+        key,
+        lambda: redis_single_flight(key, read, compute, lock_seconds=get_settings().agent_deadline_seconds),
+    )
 
-    last_msg = state["messages"][-1]
-    tool_calls = getattr(last_msg, "tool_calls", [])
 
-    if not tool_calls:
-        return state
-    
-    tool_call = tool_calls[0]  
+async def _run_tool_call(tool_call: dict, semaphore: asyncio.Semaphore) -> ToolMessage:
     tool_name = tool_call["name"]
-    tool_args = tool_call["args"]
 
-    tool_fn = TOOLS_REGISTRY.get(tool_name)
+    tool_fn = get_tool(tool_name)
     if tool_fn is None:
-        return {"messages": [ToolMessage(
+        return ToolMessage(
             content=f"Tool '{tool_name}' not found.",
             name=tool_name,
             tool_call_id=tool_call["id"],
-        )]}
+        )
 
-    result = tool_fn.invoke(tool_args)
+    try:
+        # Timeout and circuit breaker are applied by the registry wrapper
+        async with semaphore:
+            result = await tool_fn.ainvoke(tool_call["args"])
+    except Exception as e:
+        result = {"error": str(e)}
 
-    tool_msg = ToolMessage(
-        content=str(result),
+    return ToolMessage(
+        content=compact_tool_output(tool_name, result),
+        artifact=result,  # full result, not sent to the LLM
         name=tool_name,
         tool_call_id=tool_call["id"],
     )
 
-    return {"messages": [tool_msg]}
+
+async def tool_node(state: AgentState) -> AgentState:
+    """
+    Runs every tool call of the last AIMessage concurrently, bounded by
+    TOOL_MAX_CONCURRENCY. Each call gets its own timeout, never past the
+    run deadline; ToolMessages keep the call order.
+    """
+
+    last_msg = state["messages"][-1]
+    tool_calls = getattr(last_msg, "tool_calls", [])
+
+    if not tool_calls:
+        return {"messages": []}
+
+    # Tools (and their HTTP calls) never outlive the run deadline
+    budget = state.get("budget")
+    semaphore = asyncio.Semaphore(get_settings().tool_max_concurrency)
+    with deadline_scope(budget["deadline"] if budget else None):
+        tool_msgs = await asyncio.gather(
+            *(_run_tool_call(tool_call, semaphore) for tool_call in tool_calls)
+        )
+
+    update = {"messages": list(tool_msgs)}
+    if budget:
+        update["budget"] = charge_tool_hop(budget)
+    return update
+
+
+# LLM calls the full pipeline makes at minimum (planner, executor, critic)
+AGENT_MIN_LLM_CALLS = 3
 
 
-def planner_node(state: AgentState) -> AgentState:
+async def router_node(state: AgentState) -> AgentState:
+    """
+    Rule-based pre-routing: clearly single-tool requests go straight to
+    tool_node (synthetic tool call), everything else to the planner.
+    """
+
+    last = state["messages"][-1]
+    tool_call = match_fast_path(last.content) if isinstance(last, HumanMessage) else None
+
+    if tool_call is None:
+        await metrics.incr("router.agent")
+        return {"route": "agent"}
+
+    await metrics.incr("router.fast")
+    await metrics.incr(f"router.fast.{tool_call['name']}")
+
+    return {
+        "route": "fast",
+        "messages": [AIMessage(content="", tool_calls=[tool_call])],
+    }
+
+
+async def responder_node(state: AgentState) -> AgentState:
+    """
+    Answers a fast-path request from its tool result: a template when
+    possible, otherwise a single formatting LLM call.
+    """
+
+    tool_msg = state["messages"][-1]
+    tool_call = state["messages"][-2].tool_calls[0]
+
+    answer = render_fast_answer(tool_call, tool_msg.artifact)
+    if answer is not None:
+        await metrics.incr("router.llm_calls_saved", AGENT_MIN_LLM_CALLS)
+        return {"messages": [AIMessage(content=answer)]}
+
+    prompt = [
+        SystemMessage(
+            content=("""
+                You are "Astra". Answer the user's last question using ONLY the tool output above.
+                Be brief and clear. If the tool returned an error, say the information is
+                currently unavailable. NEVER call tools. NEVER mention tools or internal roles.
+                """
+            )
+        )
+    ] + _context(state)
+
+    result = await _invoke_llm(prompt)
+    await metrics.incr("router.llm_calls_saved", AGENT_MIN_LLM_CALLS - 1)
+    return _charged(state, result)
 
-    messages = state["messages"]
+
+async def planner_node(state: AgentState) -> AgentState:
 
     prompt = [
         SystemMessage(
@@ -81,35 +233,7 @@ def planner_node(state: AgentState) -> AgentState:
 
                 AVAILABLE TOOLS (ONLY these may be used):
                      
-                1. currency_convert(amount: float, from_currency: str, to_currency: str)
-                - Convert monetary amounts from one currency to another.
-                Example:
-                    {"name": "currency_convert", "arguments": {"amount": 200, "from_currency": "USD", "to_currency": "INR"}}
-
-                2. get_current_datetime(format: str = "%Y-%m-%d %H:%M:%S")
-                - Returns the current date/time in the given format.
-                Example:
-                    {"name": "get_current_datetime", "arguments": {"format": "%Y-%m-%d"}}
-
-                3. get_news(query: str, max_results: int = 5)
-                - Fetch latest news articles.
-                Example:
-                    {"name": "get_news", "arguments": {"query": "AI research", "max_results": 3}}
-
-                4. translate_language(text: str, target_lang: str)
-                - Translate text to a target language.
-                Example:
-                    {"name": "translate_language", "arguments": {"text": "Hello", "target_lang": "hi"}}
-
-                5. get_weather(city: str)
-                - Get weather for a given city.
-                Example:
-                    {"name": "get_weather", "arguments": {"city": "Delhi"}}
-
-                6. web_search(query: str, max_results: int = 5)
-                - Performs a web search and returns structured results.
-                Example:
-                    {"name": "web_search", "arguments": {"query": "best laptops 2025", "max_results": 5}}
+""" + describe_tools(indent=16 * " ") + """
 
                 RULES ABOUT TOOLS:
                 - Only call tools listed above.
@@ -132,6 +256,7 @@ def planner_node(state: AgentState) -> AgentState:
                 - Translation → use translate_language
                 - Latest news → use get_news
                 - General queries, unknown information → use web_search
+                - The same lookup for several cities, amounts or texts → its batch tool, in ONE call
 
                 WHAT NOT TO DO:
                 - Do NOT mention or suggest any tool not in the allowed list.
@@ -140,15 +265,13 @@ def planner_node(state: AgentState) -> AgentState:
                 """
             )
         )
-    ] + messages
+    ] + _context(state)
 
-    result = llm.invoke(prompt)
-    return {"messages": [result]}
+    result = await _invoke_llm(prompt)
+    return _charged(state, result)
 
 
-def executor_node(state: AgentState) -> AgentState:
-    messages = state["messages"]
-
+async def executor_node(state: AgentState) -> AgentState:
     prompt = [
         SystemMessage(
             content=("""                 
@@ -168,35 +291,7 @@ def executor_node(state: AgentState) -> AgentState:
                      
                 AVAILABLE TOOLS (ONLY these may be used):
                      
-                1. currency_convert(amount: float, from_currency: str, to_currency: str)
-                - Convert monetary amounts from one currency to another.
-                Example:
-                    {"name": "currency_convert", "arguments": {"amount": 200, "from_currency": "USD", "to_currency": "INR"}}
-
-                2. get_current_datetime(format: str = "%Y-%m-%d %H:%M:%S")
-                - Returns the current date/time in the given format.
-                Example:
-                    {"name": "get_current_datetime", "arguments": {"format": "%Y-%m-%d"}}
-
-                3. get_news(query: str, max_results: int = 5)
-                - Fetch latest news articles.
-                Example:
-                    {"name": "get_news", "arguments": {"query": "AI research", "max_results": 3}}
-
-                4. translate_language(text: str, target_lang: str)
-                - Translate text to a target language.
-                Example:
-                    {"name": "translate_language", "arguments": {"text": "Hello", "target_lang": "hi"}}
-
-                5. get_weather(city: str)
-                - Get weather for a given city.
-                Example:
-                    {"name": "get_weather", "arguments": {"city": "Delhi"}}
-
-                6. web_search(query: str, max_results: int = 5)
-                - Performs a web search and returns structured results.
-                Example:
-                    {"name": "web_search", "arguments": {"query": "best laptops 2025", "max_results": 5}}
+""" + describe_tools(indent=16 * " ") + """
 
                 RULES ABOUT TOOLS:
                 - Only call tools listed above.
@@ -206,19 +301,19 @@ def executor_node(state: AgentState) -> AgentState:
                     {"name": "web_search", "arguments": {"query": <user_query>}}
                      
 
-                SEQUENTIAL TOOL USE:
-                - You may call multiple tools in sequence across multiple turns.
+                PARALLEL AND SEQUENTIAL TOOL USE:
+                - Tools that do not depend on each other MUST be called together in the same turn.
                 - Example:
-                    To answer “What is today's weather in Delhi?”:
-                    1. First call get_current_datetime(), get the response.
-                    2. And then call get_weather(city) 
-                - After each tool output, evaluate whether another tool is needed.
-                - Continue calling tools one by one until all required information is gathered.
+                    To answer “What is the weather in Delhi and 100 USD in INR?”:
+                    call get_weather(city) AND currency_convert(...) in ONE turn.
+                - The same lookup for several cities, amounts or texts → ONE call to its batch tool.
+                - Only call tools in separate turns when a later call needs an earlier result.
+                - After each round of tool outputs, evaluate whether another tool is needed.
                 - THEN produce the final answer.
                 
                 TOOL CALL RULES:
-                - A tool call message MUST contain ONLY the tool call.
-                - You may call EXACTLY ONE tool per turn.
+                - A tool call message MUST contain ONLY the tool calls.
+                - You may call SEVERAL tools per turn when they are independent.
                 - NEVER call tools named “python”, “python_exec”, “code_interpreter”, or any undefined tool.
                 - Arguments must EXACTLY match the tool signature.
                 - If planner references a nonexistent tool → fallback to web_search.
@@ -232,14 +327,40 @@ def executor_node(state: AgentState) -> AgentState:
                 """
             )
         )
-    ] + messages
-
-    result = llm.invoke(prompt)
-    return {"messages": [result]}
-
-
-def critic_node(state: AgentState) -> AgentState:
-    messages = state["messages"]
+    ] + _context(state)
+
+    result = await _invoke_llm(prompt)
+    return _charged(state, result)
+
+
+def _skipped_tool_calls(state: AgentState) -> List[ToolMessage]:
+    """
+    Results for tool calls the run stopped before making (budget exhausted).
+    They go into the checkpointed state: every tool call must be answered
+    by a ToolMessage, or the next turn's prompt is rejected by the LLM API.
+    """
+    tool_calls = getattr(state["messages"][-1], "tool_calls", None) or []
+    reason = exhausted_reason(state.get("budget")) or "budget exhausted"
+
+    return [
+        ToolMessage(content=f"skipped: {reason}", name=call["name"], tool_call_id=call["id"])
+        for call in tool_calls
+    ]
+
+
+async def critic_node(state: AgentState) -> AgentState:
+    skipped = _skipped_tool_calls(state)
+    context = _context(state) + skipped
+
+    # Run stopped by its budget: answer with what was gathered
+    if skipped:
+        context.append(
+            SystemMessage(content=(
+                f"The run stopped early: {exhausted_reason(state.get('budget')) or 'budget exhausted'}. "
+                "Answer the user as well as possible with the information gathered so far, "
+                "and say briefly what could not be looked up."
+            ))
+        )
 
     prompt = [
         SystemMessage(
@@ -262,40 +383,87 @@ def critic_node(state: AgentState) -> AgentState:
                 """
             )
         )
-    ] + messages
+    ] + context
 
-    result = llm.invoke(prompt)
-    return {"messages": [result]}
+    result = await _invoke_llm(prompt)
+    update = _charged(state, result)
+    update["messages"] = skipped + update["messages"]
+    return update
 
 def route_from_executor(state: AgentState):
 
     last = state["messages"][-1]
     tool_calls = getattr(last, "tool_calls", [])
 
-    if tool_calls:
+    if tool_calls and exhausted_reason(state.get("budget")) is None:
         return "tool_node"
     
     return "critic"
 
 
-graph = StateGraph(AgentState)
+def route_from_router(state: AgentState):
+    return "tool_node" if state.get("route") == "fast" else "planner"
 
-graph.add_node("planner", planner_node)
-graph.add_node("executor", executor_node)
-graph.add_node("tool_node", tool_node)
-graph.add_node("critic", critic_node)
 
-graph.add_edge(START, "planner")
-graph.add_edge("planner", "executor")
-graph.add_conditional_edges(
-    "executor",
-    route_from_executor,
-    {
-        "tool_node": "tool_node",
-        "critic": "critic"
-    }
-)
-graph.add_edge("tool_node", "executor")
-graph.add_edge("critic", END)
+def route_from_tools(state: AgentState):
+    return "responder" if state.get("route") == "fast" else "executor"
+
+
+NODE_NAMES = ("router", "planner", "executor", "tool_node", "critic", "responder")
+
+# Nodes whose output is the final answer of a turn
+ANSWER_NODES = ("critic", "responder")
+
+
+@lru_cache
+def get_multi_agent_app():
+    """
+    Compiled graph, built on first use (not at import).
+    """
+    graph = StateGraph(AgentState)
+
+    graph.add_node("router", router_node)
+    graph.add_node("planner", planner_node)
+    graph.add_node("executor", executor_node)
+    graph.add_node("tool_node", tool_node)
+    graph.add_node("critic", critic_node)
+    graph.add_node("responder", responder_node)
+
+    graph.add_edge(START, "router")
+    graph.add_conditional_edges(
+        "router",
+        route_from_router,
+        {
+            "tool_node": "tool_node",
+            "planner": "planner"
+        }
+    )
+    graph.add_edge("planner", "executor")
+    graph.add_conditional_edges(
+        "executor",
+        route_from_executor,
+        {
+            "tool_node": "tool_node",
+            "critic": "critic"
+        }
+    )
+    graph.add_conditional_edges(
+        "tool_node",
+        route_from_tools,
+        {
+            "responder": "responder",
+            "executor": "executor"
+        }
+    )
+    graph.add_edge("critic", END)
+    graph.add_edge("responder", END)
+
+    # Conversation state is checkpointed per session (thread_id = session id)
+    settings = get_settings()
+    checkpointer = RedisCheckpointSaver(
+        get_async_redis_raw_client(),
+        ttl_seconds=settings.checkpoint_ttl_seconds,
+        keep=settings.checkpoint_keep,
+    )
 
-multi_agent_app = graph.compile()
\ No newline at end of file
+    return graph.compile(checkpointer=checkpointer)
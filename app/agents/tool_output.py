@@ -0,0 +1,89 @@
+# app/agents/tool_output.py
+import json
+from typing import Any, List
+from urllib.parse import urlsplit
+
+from app.core.config import get_settings
+from app.utils.tokens import count_tokens, truncate_tokens
+
+# Token budget of a tool's output as seen by the LLM (default:
+# TOOL_OUTPUT_TOKEN_BUDGET). The full result stays in the ToolMessage
+# artifact and in the stored message's meta.
+TOOL_OUTPUT_TOKENS = {
+    "web_search": 700,
+    "get_news": 500,
+}
+
+# Free-text fields of list results that may be shortened
+TRIMMABLE_FIELDS = ("snippet", "description", "content")
+
+# Never cut a snippet below this, drop whole items instead
+MIN_FIELD_TOKENS = 24
+
+
+def _serialize(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _url_key(url: str) -> str:
+    parts = urlsplit(url.strip())
+    return f"{parts.netloc.lower().removeprefix('www.')}{parts.path.rstrip('/')}?{parts.query}"
+
+
+def dedupe_by_url(items: List[Any]) -> List[Any]:
+    """
+    Drops items whose "url" was already seen (case/slash/fragment-insensitive).
+    """
+    seen, unique = set(), []
+    for item in items:
+        url = item.get("url") if isinstance(item, dict) else None
+        if url:
+            key = _url_key(url)
+            if key in seen:
+                continue
+            seen.add(key)
+        unique.append(item)
+    return unique
+
+
+def _trim_items(items: List[Any], budget: int) -> List[Any]:
+    items = [
+        {k: " ".join(v.split()) if k in TRIMMABLE_FIELDS and isinstance(v, str) else v for k, v in item.items()}
+        if isinstance(item, dict) else item
+        for item in items
+    ]
+
+    while items:
+        # What's left after the fixed parts (titles, urls, ...) is shared evenly
+        fixed = count_tokens(_serialize([
+            {k: v for k, v in item.items() if k not in TRIMMABLE_FIELDS} if isinstance(item, dict) else item
+            for item in items
+        ]))
+        share = (budget - fixed) // len(items)
+
+        if share >= MIN_FIELD_TOKENS or len(items) == 1:
+            return [
+                {k: truncate_tokens(v, max(share, MIN_FIELD_TOKENS)) if k in TRIMMABLE_FIELDS and isinstance(v, str) else v
+                 for k, v in item.items()}
+                if isinstance(item, dict) else item
+                for item in items
+            ]
+
+        items = items[:-1]  # results are ranked; the tail goes first
+
+    return items
+
+
+def compact_tool_output(tool_name: str, result: Any) -> str:
+    """
+    Serialized tool result for the LLM: list results are de-duplicated by
+    URL and their free-text fields trimmed to the tool's token budget.
+    Other results are only serialized compactly (never cut).
+    """
+    if isinstance(result, list):
+        budget = TOOL_OUTPUT_TOKENS.get(tool_name, get_settings().tool_output_token_budget)
+        result = dedupe_by_url(result)
+        if count_tokens(_serialize(result)) > budget:
+            result = _trim_items(result, budget)
+
+    return _serialize(result)
@@ -1,30 +1,22 @@
 # app/api/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import SessionLocal
 from app.models.user import User
 from app.api.schemas import UserCreate, UserLogin, UserResponse, LoginResponse
-from app.core.security import hash_password, verify_password, create_access_token
-from app.api.deps import get_current_user
+from app.core.security import ahash_password, averify_and_update_password, create_access_token
+from app.api.deps import get_current_user, get_db, get_token_claims
+from app.services.principal_cache import Principal, revoke_token
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
-# DB dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 # SIGNUP
 @router.post("/signup", response_model=UserResponse, status_code=201)
-def signup(data: UserCreate, db: Session = Depends(get_db)):
+async def signup(data: UserCreate, db: AsyncSession = Depends(get_db)):
     # Check if user exists
-    existing = db.query(User).filter(User.email == data.email).first()
+    existing = await db.scalar(select(User).where(User.email == data.email))
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
@@ -32,27 +24,34 @@ def signup(data: UserCreate, db: Session = Depends(get_db)):
     new_user = User(
         fullname=data.fullname,
         email=data.email,
-        password_hash=hash_password(data.password),
+        password_hash=await ahash_password(data.password),
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return new_user
 
 
 # LOGIN
 @router.post("/login", response_model=LoginResponse, status_code=200)
-def login(data: UserLogin, response: Response, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email).first()
+async def login(data: UserLogin, response: Response, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == data.email))
 
     if not user:
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
-    if not verify_password(data.password, user.password_hash):
+    valid, new_hash = await averify_and_update_password(data.password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
-    token = create_access_token({"sub": str(user.id)})
+    # Transparent upgrade when BCRYPT_ROUNDS changed since the hash was made
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+
+    # Identity claims let requests authenticate without a users lookup
+    token = create_access_token({"sub": str(user.id), "email": user.email, "name": user.fullname})
 
     response.set_cookie(
         key="access_token",
@@ -70,7 +69,8 @@ def login(data: UserLogin, response: Response, db: Session = Depends(get_db)):
 
 # LOGOUT
 @router.post("/logout")
-def logout(current_user : User = Depends(get_current_user)):
+async def logout(claims: dict = Depends(get_token_claims), current_user : Principal = Depends(get_current_user)):
+    await revoke_token(claims)
     response = JSONResponse({"message": "Logged out successfully"})
     response.delete_cookie(
         key="access_token",
@@ -2,22 +2,23 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import SessionLocal
-from app.models.user import User
-from app.core.security import SECRET_KEY, ALGORITHM
+from app.db.session import SessionLocal, get_engine
+from app.core.config import get_settings
+from app.services.principal_cache import Principal, TokenRevoked, UnknownUser, resolve_principal
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    """
+    The app's single DB session dependency (pooled async engine).
+    """
+    get_engine()  # binds SessionLocal on first use
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 def extract_token(request: Request) -> str | None:
@@ -41,14 +42,15 @@ def extract_token(request: Request) -> str | None:
     return None
 
 
-def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
+def get_token_claims(request: Request) -> dict:
     token = extract_token(request)
 
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        settings = get_settings()
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         user_id: str = payload.get("sub")
 
         if user_id is None:
@@ -57,10 +59,17 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    # Fetch user from DB
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    return payload
 
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
 
-    return user
+async def get_current_user(claims: dict = Depends(get_token_claims), db: AsyncSession = Depends(get_db)) -> Principal:
+    """
+    Resolved from the principal cache; the DB (session opened lazily)
+    is only queried for tokens without identity claims on a cache miss.
+    """
+    try:
+        return await resolve_principal(claims, db)
+    except TokenRevoked:
+        raise HTTPException(status_code=401, detail="Token revoked")
+    except UnknownUser:
+        raise HTTPException(status_code=401, detail="User not found")
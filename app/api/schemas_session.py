@@ -1,11 +1,19 @@
 # app/api/schemas_session.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
 
+class RunBudgetOverride(BaseModel):
+    # Unset fields use the server defaults from Settings
+    max_tool_hops: Optional[int] = Field(None, ge=0, le=20)
+    deadline_seconds: Optional[float] = Field(None, gt=0, le=300)
+    max_tokens: Optional[int] = Field(None, gt=0, le=200_000)
+
+
 class MessageCreate(BaseModel):
     content: str
+    budget: Optional[RunBudgetOverride] = None
 
 
 class MessageResponse(BaseModel):
@@ -26,6 +34,19 @@ class SendMessageResponse(BaseModel):
         orm_mode = True
 
 
+class MessageJobAccepted(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
+
+class MessageJobStatus(BaseModel):
+    job_id: str
+    status: str  # queued / started / finished / failed / ...
+    result: Optional[SendMessageResponse] = None  # set once finished
+    error: Optional[str] = None
+
+
 class SessionCreate(BaseModel):
     title: Optional[str] = None
 
@@ -40,11 +61,33 @@ class SessionResponse(BaseModel):
         orm_mode = True
 
 
+class MessagePreview(BaseModel):
+    sender: str
+    content: str  # first PREVIEW_CHARS characters
+    created_at: datetime
+
+
+class SessionListItem(SessionResponse):
+    message_count: int
+    last_message: Optional[MessagePreview] = None
+
+
+class SessionPage(BaseModel):
+    sessions: List[SessionListItem]
+    next_cursor: Optional[str] = None  # older sessions, None on the last page
+
+
+class MessagePage(BaseModel):
+    messages: List[MessageResponse]  # oldest first within the page
+    next_cursor: Optional[str] = None  # older messages, None on the last page
+
+
 class SessionDetail(BaseModel):
     id: int
     title: Optional[str]
     status: str
-    messages: List[MessageResponse]
+    messages: List[MessageResponse]  # latest page only, see next_cursor
+    next_cursor: Optional[str] = None
 
     class Config:
         orm_mode = True
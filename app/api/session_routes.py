@@ -1,122 +1,333 @@
 # app/api/session_routes.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from app.api.deps import get_current_user, get_db
-from app.models.user import User
+from app.services.principal_cache import Principal
 from app.models.session import Session as SessionModel
 from app.models.message import Message
+from app.api.pagination import encode_cursor, decode_cursor
 from app.api.schemas_session import (
-    SessionCreate, SessionResponse, SessionDetail,
-    MessageCreate, MessageResponse, SendMessageResponse
+    SessionCreate, SessionResponse, SessionDetail, SessionPage,
+    MessageCreate, MessageResponse, MessagePage, SendMessageResponse,
+    MessageJobAccepted, MessageJobStatus
 )
+from app.core.config import get_settings
 from app.services.llm_service import generate_llm_response
-from app.services.agent_service import run_multi_agent
+from app.services.agent_service import stream_multi_agent
+from app.services.agent_jobs import enqueue_turn, job_status
+from app.services.turn_service import complete_turn, load_history, release_connection, store_messages
 
 
 router = APIRouter(prefix="/sessions", tags=["Sessions"])
 
+# Length of the last-message preview in the session list
+PREVIEW_CHARS = 120
+
+
+async def _get_owned_session(db: AsyncSession, session_id: int, user: Principal) -> SessionModel:
+
+    session = await db.scalar(
+        select(SessionModel).where(SessionModel.id == session_id, SessionModel.user_id == user.id)
+    )
+
+    if not session:
+        raise HTTPException(404, "Session not found")
+
+    return session
+
+
+# Hot query builders; benchmarks/query_plans.py checks that they stay on
+# the composite indexes (ix_messages_session_created, ix_sessions_user_created)
+
+def message_page_query(session_id: int, limit: int, before: tuple | None = None) -> Select:
+    """
+    Newest-first messages of a session, strictly older than the
+    (created_at, id) key `before`.
+    """
+
+    query = select(Message).where(Message.session_id == session_id)
+    if before:
+        query = query.where(tuple_(Message.created_at, Message.id) < before)
+
+    return query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit)
+
+
+def session_page_query(user_id: int, limit: int, before: tuple | None = None) -> Select:
+    """
+    Newest-first sessions of a user with their message count and a
+    preview of their last message (correlated subqueries, one round trip).
+    """
+
+    message_count = (
+        select(func.count(Message.id))
+        .where(Message.session_id == SessionModel.id)
+        .correlate(SessionModel)
+        .scalar_subquery()
+    )
+    last_message_id = (
+        select(Message.id)
+        .where(Message.session_id == SessionModel.id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(1)
+        .correlate(SessionModel)
+        .scalar_subquery()
+    )
+    last_message = aliased(Message)
+
+    query = (
+        select(
+            SessionModel,
+            message_count.label("message_count"),
+            last_message.sender,
+            func.substr(last_message.content, 1, PREVIEW_CHARS).label("preview"),
+            last_message.created_at.label("last_message_at"),
+        )
+        .outerjoin(last_message, last_message.id == last_message_id)
+        .where(SessionModel.user_id == user_id)
+    )
+    if before:
+        query = query.where(tuple_(SessionModel.created_at, SessionModel.id) < before)
+
+    return query.order_by(SessionModel.created_at.desc(), SessionModel.id.desc()).limit(limit)
+
+
+async def _message_page(db: AsyncSession, session_id: int, limit: int, before: str | None) -> dict:
+    """
+    Keyset page of a session's messages, walking back from the newest
+    (or from the `before` cursor). Returned oldest-first for display.
+    """
+
+    rows = (await db.scalars(
+        message_page_query(session_id, limit + 1, decode_cursor(before) if before else None)
+    )).all()
+
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+
+    return {"messages": page[::-1], "next_cursor": next_cursor}
+
+
+def _answer_cache_allowed(request: Request) -> bool:
+    """
+    Per-request answer cache bypass:
+    X-Answer-Cache: bypass  or  Cache-Control: no-cache
+    """
+    if request.headers.get("X-Answer-Cache", "").lower() == "bypass":
+        return False
+    return "no-cache" not in request.headers.get("Cache-Control", "").lower()
+
+
+def _job_mode(request: Request) -> bool:
+    """
+    Run the turn as a background job: AGENT_JOB_MODE, or per request
+    with the RFC 7240 header  Prefer: respond-async
+    """
+    return get_settings().agent_job_mode or "respond-async" in request.headers.get("Prefer", "").lower()
+
+
+def _budget_overrides(payload: MessageCreate) -> dict | None:
+    return payload.budget.model_dump(exclude_none=True) if payload.budget else None
+
+
 # create session
 @router.post("/", response_model=SessionResponse)
-def create_session(payload: SessionCreate, db: Session = Depends(get_db), user : User = Depends(get_current_user)):
+async def create_session(payload: SessionCreate, db: AsyncSession = Depends(get_db), user : Principal = Depends(get_current_user)):
     
     new_session = SessionModel(
         user_id=user.id,
         title=payload.title or "New Session"
     )
     db.add(new_session)
-    db.commit()
-    db.refresh(new_session)
+    await db.commit()
+    await db.refresh(new_session)
 
     return new_session
 
-# get user sessions
-@router.get("/", response_model=list[SessionResponse])
-def get_user_sessions(db: Session = Depends(get_db), user : User = Depends(get_current_user)):
-    
-    sessions = db.query(SessionModel)\
-                 .filter(SessionModel.user_id == user.id)\
-                 .order_by(SessionModel.created_at.desc())\
-                 .all()
-    
-    return sessions
+# get user sessions (newest first, keyset-paginated)
+@router.get("/", response_model=SessionPage)
+async def get_user_sessions(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    user : Principal = Depends(get_current_user),
+):
+
+    rows = (await db.execute(
+        session_page_query(user.id, limit + 1, decode_cursor(cursor) if cursor else None)
+    )).all()
+
+    page = rows[:limit]
+    last = page[-1].Session if page else None
+
+    return {
+        "sessions": [
+            {
+                **SessionResponse.model_validate(row.Session, from_attributes=True).model_dump(),
+                "message_count": row.message_count,
+                "last_message": {
+                    "sender": row.sender,
+                    "content": row.preview,
+                    "created_at": row.last_message_at,
+                } if row.sender is not None else None,
+            }
+            for row in page
+        ],
+        "next_cursor": encode_cursor(last.created_at, last.id) if len(rows) > limit else None,
+    }
 
-# get session details
+# get session details (with the latest page of messages)
 @router.get("/{session_id}", response_model=SessionDetail)
-def get_session_details(session_id: int, db: Session = Depends(get_db), user : User = Depends(get_current_user)):
+async def get_session_details(
+    session_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    user : Principal = Depends(get_current_user),
+):
     
-    session = db.query(SessionModel).filter(
-        SessionModel.id == session_id,
-        SessionModel.user_id == user.id
-    ).first()
+    session = await _get_owned_session(db, session_id, user)
+    page = await _message_page(db, session_id, limit, None)
 
-    if not session:
-        raise HTTPException(404, "Session not found")
+    return {"id": session.id, "title": session.title, "status": session.status, **page}
 
-    return session
+# get older messages of a session
+@router.get("/{session_id}/messages", response_model=MessagePage)
+async def get_session_messages(
+    session_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    before: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    user : Principal = Depends(get_current_user),
+):
+
+    await _get_owned_session(db, session_id, user)
+    return await _message_page(db, session_id, limit, before)
 
 # send new message
-@router.post("/{session_id}/messages", response_model=SendMessageResponse)
-async def send_message(session_id: int, payload: MessageCreate, db: Session = Depends(get_db), user : User = Depends(get_current_user)):
+@router.post(
+    "/{session_id}/messages",
+    response_model=SendMessageResponse,
+    responses={202: {"model": MessageJobAccepted, "description": "Queued (job mode)"}},
+)
+async def send_message(session_id: int, payload: MessageCreate, request: Request, db: AsyncSession = Depends(get_db), user : Principal = Depends(get_current_user)):
 
     """
-    Stores the user message, generates an assistant response,
-    stores the assistant message, and returns both.
+    Generates an assistant response, then stores the user and assistant
+    messages in one transaction and returns both. A failed run stores
+    nothing. In job mode the turn is queued instead (202 + job id).
     """
     
     # 1. Verify session belongs to user
-    session = db.query(SessionModel).filter(
-        SessionModel.id == session_id,
-        SessionModel.user_id == user.id
-    ).first()
+    session = await _get_owned_session(db, session_id, user)
 
-    if not session:
-        raise HTTPException(404, "Session not found")
+    # 2a. Job mode: a worker process (python -m app.worker) runs the turn;
+    #     the client polls the status URL for both messages
+    if _job_mode(request):
+        await release_connection(db)
+        job = await asyncio.to_thread(
+            enqueue_turn, session_id, user.id, payload.content,
+            _budget_overrides(payload), _answer_cache_allowed(request),
+        )
+        status_url = f"/sessions/{session_id}/jobs/{job.id}"
+        return JSONResponse(
+            status_code=202,
+            content={"job_id": job.id, "status": "queued", "status_url": status_url},
+            headers={"Location": status_url},
+        )
 
-    # 2. Store user message
-    user_msg = Message(
-        session_id=session_id,
-        sender="user",
-        content=payload.content,
-        meta=None
-    )
-    db.add(user_msg)
-    db.commit()
-    db.refresh(user_msg)
-
-    # 3. Build full conversation history for LLM
-    db_messages = db.query(Message).filter(
-        Message.session_id == session_id
-    ).order_by(Message.created_at.asc()).all()
-
-    conversation = [
-        {
-            "role": "user" if m.sender == "user" else "assistant",
-            "content": m.content
-        }
-        for m in db_messages
-    ]
-
-    # # 4. Generate assistant response via LLM
+    # # 2b. Generate assistant response via LLM
     # assistant_reply = await generate_llm_response(conversation)
 
-    # 4. Generate assistant response via running multi agent workflow
-    assistant_reply = run_multi_agent(conversation)
-
-    # 5. Store assistant message in DB
-    assistant_msg = Message(
-        session_id=session_id,
-        sender="assistant",
-        content=assistant_reply,
-        meta=None
+    # 2b-3. Run the multi agent workflow and store both messages
+    #       (and the refreshed summary) in one transaction
+    user_msg, assistant_msg = await complete_turn(
+        db, session, payload.content,
+        budget=_budget_overrides(payload),
+        use_cache=_answer_cache_allowed(request),
     )
 
-    db.add(assistant_msg)
-    db.commit()
-    db.refresh(assistant_msg)
-
-    # 6. Return both messages for frontend convenience
+    # 4. Return both messages for frontend convenience
     return {
         "user_message": user_msg,
         "assistant_message": assistant_msg
     }
+
+
+# poll a queued turn (job mode)
+@router.get("/{session_id}/jobs/{job_id}", response_model=MessageJobStatus)
+async def get_message_job(
+    session_id: int,
+    job_id: str,
+    wait: float = Query(0, ge=0, le=30, description="long-poll up to this many seconds for the result"),
+    user : Principal = Depends(get_current_user),
+):
+
+    status = await job_status(job_id, wait)
+
+    # Ownership comes from the job itself, no DB lookup per poll
+    if not status or status["user_id"] != user.id or status["session_id"] != session_id:
+        raise HTTPException(404, "Job not found")
+
+    return status
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# send new message, streaming progress and tokens (Server-Sent Events)
+@router.post("/{session_id}/messages/stream")
+async def stream_message(session_id: int, payload: MessageCreate, request: Request, db: AsyncSession = Depends(get_db), user : Principal = Depends(get_current_user)):
+
+    """
+    Same flow as send_message, but returns a text/event-stream:
+        event: user_message  -> stored user message
+        event: node          -> agent node started / finished
+        event: token         -> final answer tokens as they arrive
+        event: assistant_message -> stored assistant message (last event)
+    """
+
+    # The user message is stored up front: it's the stream's first event
+    session = await _get_owned_session(db, session_id, user)
+
+    user_msg, = await store_messages(db, session_id, ("user", payload.content, None))
+
+    async def event_stream():
+        yield _sse("user_message", MessageResponse.model_validate(user_msg, from_attributes=True).model_dump(mode="json"))
+
+        final = {}
+        try:
+            async for event in stream_multi_agent(
+                session_id,
+                payload.content,
+                session.summary,
+                load_history=lambda: load_history(db, session, user_msg.id),
+                budget=_budget_overrides(payload),
+                use_cache=_answer_cache_allowed(request),
+            ):
+                if event["event"] == "final":
+                    final = event["data"]
+                else:
+                    yield _sse(event["event"], event["data"])
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+            return
+
+        # Persist once the run is complete
+        session.summary = final["summary"]
+        assistant_msg, = await store_messages(
+            db, session_id,
+            ("assistant", final["content"], {"tools": final["tools"]} if final["tools"] else None),
+        )
+        yield _sse("assistant_message", MessageResponse.model_validate(assistant_msg, from_attributes=True).model_dump(mode="json"))
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -15,6 +15,77 @@ class Settings(BaseModel):
     groq_api_key: str | None = None
     tavily_api_key: str | None = None
     redis_url: str | None = None
+    debug: bool = False
+
+    # Database pool (async engine)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+
+    # Agent tool execution
+    tool_max_concurrency: int = 4
+    tool_timeout_seconds: float = 20.0
+    tool_output_token_budget: int = 800  # per tool result, as sent to the LLM
+
+    # Per-tool circuit breakers (state shared through Redis)
+    breaker_failure_threshold: int = 5
+    breaker_window_seconds: float = 60.0
+    breaker_cooldown_seconds: float = 30.0
+
+    # Shared outbound HTTP client (tools)
+    http_connect_timeout: float = 3.0
+    http_read_timeout: float = 10.0
+    http_max_connections: int = 100
+    http_max_keepalive: int = 20
+    http_retries: int = 2
+    http_retry_backoff: float = 0.2
+
+    # Per-run agent budget (overridable per request)
+    agent_max_tool_hops: int = 5
+    agent_deadline_seconds: float = 60.0
+    agent_max_tokens: int = 50000
+
+    # Final-answer cache (opt-in)
+    answer_cache_enabled: bool = False
+    answer_cache_ttl_seconds: int = 3600
+
+    # Tool result cache: per-process LRU in front of Redis
+    cache_local_maxsize: int = 1024
+    cache_local_ttl_seconds: float = 30.0
+
+    # Cache value encoding (see app/utils/codec.py)
+    cache_codec: str = "msgpack"
+    cache_compress_min_bytes: int = 1024
+    cache_zstd_level: int = 3
+
+    # Currency rate tables kept warm (first base is the cross-rate pivot)
+    currency_rate_bases: str = "USD,EUR"
+    currency_refresh_seconds: float = 1800.0
+
+    # Conversation window sent to the agents (older turns are summarized)
+    context_token_budget: int = 4000
+
+    # LangGraph checkpoints (Redis), one thread per chat session
+    checkpoint_ttl_seconds: int = 30 * 24 * 3600
+    checkpoint_keep: int = 20
+
+    # Authenticated principals kept per process (logout elsewhere is
+    # seen by this worker within this window)
+    auth_cache_local_ttl_seconds: float = 15.0
+
+    # Password hashing: bcrypt cost factor (2^rounds) and the size of the
+    # thread pool it runs in. Hashes with other rounds are upgraded on login.
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+
+    # Agent runs as rq jobs (python -m app.worker) instead of in the web
+    # worker. Off: only requests sending "Prefer: respond-async" are queued.
+    agent_job_mode: bool = False
+    agent_job_queue: str = "agent"
+    agent_job_timeout_seconds: int = 300
+    agent_job_result_ttl_seconds: int = 3600
 
     class Config:
         frozen = True  # make it immutable
@@ -29,5 +100,45 @@ def get_settings() -> Settings:
         openai_api_key=os.getenv("OPENAI_API_KEY"),
         groq_api_key=os.getenv("GROQ_API_KEY"),
         tavily_api_key=os.getenv("TAVILY_API_KEY"),
-        redis_url=os.getenv("REDIS_URL")
+        redis_url=os.getenv("REDIS_URL"),
+        debug=os.getenv("DEBUG", "false").lower() in ("1", "true", "yes"),
+        db_pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+        db_max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        db_pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        db_pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        db_pool_pre_ping=os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+        tool_max_concurrency=int(os.getenv("TOOL_MAX_CONCURRENCY", "4")),
+        tool_timeout_seconds=float(os.getenv("TOOL_TIMEOUT_SECONDS", "20")),
+        tool_output_token_budget=int(os.getenv("TOOL_OUTPUT_TOKEN_BUDGET", "800")),
+        breaker_failure_threshold=int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5")),
+        breaker_window_seconds=float(os.getenv("BREAKER_WINDOW_SECONDS", "60")),
+        breaker_cooldown_seconds=float(os.getenv("BREAKER_COOLDOWN_SECONDS", "30")),
+        http_connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "3")),
+        http_read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", "10")),
+        http_max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+        http_max_keepalive=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+        http_retries=int(os.getenv("HTTP_RETRIES", "2")),
+        http_retry_backoff=float(os.getenv("HTTP_RETRY_BACKOFF", "0.2")),
+        agent_max_tool_hops=int(os.getenv("AGENT_MAX_TOOL_HOPS", "5")),
+        agent_deadline_seconds=float(os.getenv("AGENT_DEADLINE_SECONDS", "60")),
+        agent_max_tokens=int(os.getenv("AGENT_MAX_TOKENS", "50000")),
+        answer_cache_enabled=os.getenv("ANSWER_CACHE_ENABLED", "false").lower() in ("1", "true", "yes"),
+        answer_cache_ttl_seconds=int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600")),
+        cache_local_maxsize=int(os.getenv("CACHE_LOCAL_MAXSIZE", "1024")),
+        cache_local_ttl_seconds=float(os.getenv("CACHE_LOCAL_TTL_SECONDS", "30")),
+        cache_codec=os.getenv("CACHE_CODEC", "msgpack"),
+        cache_compress_min_bytes=int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024")),
+        cache_zstd_level=int(os.getenv("CACHE_ZSTD_LEVEL", "3")),
+        currency_rate_bases=os.getenv("CURRENCY_RATE_BASES", "USD,EUR"),
+        currency_refresh_seconds=float(os.getenv("CURRENCY_REFRESH_SECONDS", "1800")),
+        context_token_budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "4000")),
+        checkpoint_ttl_seconds=int(os.getenv("CHECKPOINT_TTL_SECONDS", str(30 * 24 * 3600))),
+        checkpoint_keep=int(os.getenv("CHECKPOINT_KEEP", "20")),
+        auth_cache_local_ttl_seconds=float(os.getenv("AUTH_CACHE_LOCAL_TTL_SECONDS", "15")),
+        bcrypt_rounds=int(os.getenv("BCRYPT_ROUNDS", "12")),
+        password_hash_workers=int(os.getenv("PASSWORD_HASH_WORKERS", "2")),
+        agent_job_mode=os.getenv("AGENT_JOB_MODE", "false").lower() in ("1", "true", "yes"),
+        agent_job_queue=os.getenv("AGENT_JOB_QUEUE", "agent"),
+        agent_job_timeout_seconds=int(os.getenv("AGENT_JOB_TIMEOUT_SECONDS", "300")),
+        agent_job_result_ttl_seconds=int(os.getenv("AGENT_JOB_RESULT_TTL_SECONDS", "3600")),
     )
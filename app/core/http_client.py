@@ -0,0 +1,170 @@
+# app/core/http_client.py
+import asyncio
+import importlib.util
+import random
+import time
+from typing import Any, Optional
+
+import httpx
+
+from app.core.config import get_settings
+from app.core.deadline import DeadlineExceeded, time_left
+
+# HTTP/2 needs the optional `h2` package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+RETRY_STATUS = {429, 502, 503, 504}
+
+_client: Optional[httpx.Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
+_async_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _timeout(timeout: Optional[float], bounded: bool = True) -> httpx.Timeout:
+    """
+    Per-attempt timeout, clamped to the propagated deadline (if any).
+    """
+    settings = get_settings()
+    read = settings.http_read_timeout if timeout is None else timeout
+
+    left = time_left() if bounded else None
+    if left is not None:
+        if left <= 0:
+            raise DeadlineExceeded("Deadline exceeded before the request was sent")
+        read = min(read, left)
+
+    return httpx.Timeout(read, connect=min(settings.http_connect_timeout, read))
+
+
+def _client_options() -> dict:
+    settings = get_settings()
+    return {
+        "timeout": _timeout(None, bounded=False),
+        "limits": httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive,
+            keepalive_expiry=30.0,
+        ),
+        "http2": HTTP2_AVAILABLE,
+        "follow_redirects": True,
+        "headers": {"User-Agent": "agentflow/1.0"},
+    }
+
+
+def get_client() -> httpx.Client:
+    """
+    Process-wide pooled sync client (keep-alive per host).
+    """
+    global _client
+    if _client is None:
+        _client = httpx.Client(**_client_options())
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Pooled async client. One per event loop, since connections are bound
+    to the loop that opened them (e.g. workers running asyncio.run per job).
+    """
+    global _async_client, _async_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_loop is not loop:
+        _async_client = httpx.AsyncClient(**_client_options())
+        _async_loop = loop
+    return _async_client
+
+
+def _backoff(attempt: int) -> float:
+    # Exponential backoff with full jitter
+    return random.uniform(0, get_settings().http_retry_backoff * (2 ** attempt))
+
+
+def _retry_delay(response: Optional[httpx.Response], attempt: int) -> Optional[float]:
+    """
+    Seconds to wait before the next attempt, or None to give up
+    (retries used up, non-retryable status, or past the deadline).
+    """
+    if attempt >= get_settings().http_retries:
+        return None
+    if response is not None and response.status_code not in RETRY_STATUS:
+        return None
+
+    delay = _backoff(attempt)
+    left = time_left()
+    if left is not None and delay >= left:
+        return None
+    return delay
+
+
+def request_json(method: str, url: str, *, timeout: Optional[float] = None, **kwargs) -> Any:
+    """
+    Sync request returning the decoded JSON body. Transport errors and
+    429/5xx responses are retried with jittered backoff; other HTTP errors
+    raise httpx.HTTPStatusError. Attempts and retries stay within the
+    propagated deadline (app/core/deadline.py).
+    """
+    client = get_client()
+    attempt = 0
+    while True:
+        try:
+            response = client.request(method, url, timeout=_timeout(timeout), **kwargs)
+        except httpx.TransportError:
+            delay = _retry_delay(None, attempt)
+            if delay is None:
+                raise
+        else:
+            delay = _retry_delay(response, attempt)
+            if delay is None:
+                response.raise_for_status()
+                return response.json()
+
+        time.sleep(delay)
+        attempt += 1
+
+
+async def arequest_json(method: str, url: str, *, timeout: Optional[float] = None, **kwargs) -> Any:
+    """
+    Async variant of request_json.
+    """
+    client = get_async_client()
+    attempt = 0
+    while True:
+        try:
+            response = await client.request(method, url, timeout=_timeout(timeout), **kwargs)
+        except httpx.TransportError:
+            delay = _retry_delay(None, attempt)
+            if delay is None:
+                raise
+        else:
+            delay = _retry_delay(response, attempt)
+            if delay is None:
+                response.raise_for_status()
+                return response.json()
+
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+def get_json(url: str, **kwargs) -> Any:
+    return request_json("GET", url, **kwargs)
+
+
+async def aget_json(url: str, **kwargs) -> Any:
+    return await arequest_json("GET", url, **kwargs)
+
+
+async def apost_json(url: str, **kwargs) -> Any:
+    return await arequest_json("POST", url, **kwargs)
+
+
+async def aclose_http_clients():
+    """
+    Close pooled connections (application shutdown).
+    """
+    global _client, _async_client, _async_loop
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client, _async_loop = None, None
+    if _client is not None:
+        _client.close()
+        _client = None
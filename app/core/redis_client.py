@@ -1,10 +1,57 @@
 # app/core/redis_client.py
+from typing import Dict
+
 import redis
+import redis.asyncio as aioredis
 from app.core.config import get_settings
 
-settings = get_settings()
+# Clients are created on first use (not at import) so importing the app
+# needs neither REDIS_URL nor a reachable server.
+_clients: Dict[str, object] = {}
+
+
+def _get(name: str, factory, decode_responses: bool):
+    client = _clients.get(name)
+    if client is None:
+        client = _clients[name] = factory.from_url(
+            get_settings().redis_url,
+            decode_responses=decode_responses
+        )
+    return client
+
+
+def get_redis_client() -> redis.Redis:
+    return _get("sync", redis.Redis, True)
+
+
+def get_redis_raw_client() -> redis.Redis:
+    """
+    Binary-safe sync client (encoded cache values).
+    """
+    return _get("sync_raw", redis.Redis, False)
+
+
+def get_async_redis_client() -> aioredis.Redis:
+    """
+    Async client for code running on the event loop (agent nodes, tools).
+    """
+    return _get("async", aioredis.Redis, True)
+
+
+def get_async_redis_raw_client() -> aioredis.Redis:
+    """
+    Binary-safe async client (LangGraph checkpoints, encoded cache values).
+    """
+    return _get("async_raw", aioredis.Redis, False)
+
 
-redis_client = redis.Redis.from_url(
-    settings.redis_url,
-    decode_responses=True
-)
+async def aclose_redis_clients():
+    """
+    Close every client created so far (application shutdown).
+    """
+    for name, client in list(_clients.items()):
+        if isinstance(client, aioredis.Redis):
+            await client.aclose()
+        else:
+            client.close()
+        del _clients[name]
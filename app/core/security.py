@@ -1,32 +1,82 @@
-# app/core/security.py
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 from app.core.config import get_settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt releases the GIL while hashing, so a small thread pool takes the
+# ~200ms of CPU per hash off the event loop. Its size bounds how many
+# cores a login burst can use; further calls queue instead of piling up.
+_hash_pool: Optional[ThreadPoolExecutor] = None
+
+
+@lru_cache
+def get_pwd_context() -> CryptContext:
+    # Hashes whose rounds differ from BCRYPT_ROUNDS count as deprecated
+    # and are replaced by verify_and_update
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=get_settings().bcrypt_rounds)
+
 
-settings = get_settings()
+def _get_hash_pool() -> ThreadPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ThreadPoolExecutor(
+            max_workers=get_settings().password_hash_workers,
+            thread_name_prefix="password-hash",
+        )
+    return _hash_pool
 
-# Getting from environment var
-SECRET_KEY = settings.secret_key
-ALGORITHM = settings.algorithm
-ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
 
-# Password hashing
+def shutdown_hash_pool():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
+
+# Password hashing (blocking; use the async variants on the event loop)
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def verify_password(plain_password: str, hashed: str) -> bool:
-    return pwd_context.verify(plain_password, hashed)
+    return get_pwd_context().verify(plain_password, hashed)
+
+def verify_and_update_password(plain_password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """
+    Returns (valid, new_hash); new_hash is set when the stored hash uses
+    outdated parameters and should be replaced.
+    """
+    return get_pwd_context().verify_and_update(plain_password, hashed)
+
+
+async def _in_hash_pool(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_get_hash_pool(), func, *args)
+
+async def ahash_password(password: str) -> str:
+    return await _in_hash_pool(hash_password, password)
+
+async def averify_password(plain_password: str, hashed: str) -> bool:
+    return await _in_hash_pool(verify_password, plain_password, hashed)
+
+async def averify_and_update_password(plain_password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return await _in_hash_pool(verify_and_update_password, plain_password, hashed)
 
 
 # JWT creation
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
 
-    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    settings = get_settings()  # secret/algorithm come from the environment
+
+    now = datetime.now(timezone.utc)
+    expire = now + (expires_delta or timedelta(minutes=settings.access_token_expire_minutes))
+    # jti lets a single token be revoked (logout)
+    to_encode.update({"exp": expire, "iat": now, "jti": uuid.uuid4().hex})
 
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
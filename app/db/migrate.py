@@ -0,0 +1,190 @@
+# app/db/migrate.py
+"""
+Versioned schema migrations, applied once per deploy rather than by each
+API worker on startup:
+
+    python -m app.db.migrate            # apply pending migrations
+    python -m app.db.migrate --status   # list applied / pending
+
+Applied versions are recorded in `schema_migrations`. Migrations are
+idempotent, so databases created earlier by `create_all` (tables but no
+version table) are adopted as they are. Append new migrations to
+MIGRATIONS; never edit one that has shipped.
+"""
+import argparse
+import asyncio
+from dataclasses import dataclass
+from typing import Callable, List
+
+from sqlalchemy import (
+    JSON, Column, DateTime, ForeignKey, Integer, MetaData, String, Table,
+    func, inspect, select, text,
+)
+from sqlalchemy.engine import Connection
+
+from app.db.session import get_engine
+
+VERSION_TABLE = Table(
+    "schema_migrations", MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+# pg_advisory_lock key: one migrator at a time across deploy hosts
+LOCK_KEY = 0x6D696772
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+    # False for DDL that can't run inside a transaction
+    # (CREATE INDEX CONCURRENTLY); it then runs in autocommit mode
+    transactional: bool = True
+
+
+def _initial_schema(conn: Connection):
+    # Snapshot of the schema as the app first created it; deliberately
+    # not the current models, which keep changing.
+    meta = MetaData()
+    Table(
+        "users", meta,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("fullname", String, nullable=False),
+        Column("email", String, unique=True, index=True, nullable=False),
+        Column("password_hash", String, nullable=False),
+        Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    )
+    Table(
+        "sessions", meta,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+        Column("title", String, nullable=True),
+        Column("status", String),
+        Column("created_at", DateTime(timezone=True), server_default=func.now()),
+        Column("updated_at", DateTime(timezone=True)),
+    )
+    Table(
+        "messages", meta,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("session_id", Integer, ForeignKey("sessions.id"), nullable=False),
+        Column("sender", String, nullable=False),
+        Column("content", String, nullable=False),
+        Column("meta", JSON, nullable=True),
+        Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    )
+    meta.create_all(conn, checkfirst=True)
+
+
+def _session_summary(conn: Connection):
+    columns = {c["name"] for c in inspect(conn).get_columns("sessions")}
+    if "summary" not in columns:
+        conn.execute(text("ALTER TABLE sessions ADD COLUMN summary TEXT"))
+
+
+def _create_index(conn: Connection, name: str, table: str, columns: str):
+    """
+    On Postgres the index is built CONCURRENTLY, so writes to `table`
+    aren't blocked while it builds.
+    """
+    if conn.dialect.name != "postgresql":
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+        return
+
+    # An interrupted concurrent build leaves an INVALID index behind,
+    # which IF NOT EXISTS would happily keep
+    invalid = conn.execute(text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).first()
+    if invalid:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY {name}"))
+
+    conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})"))
+
+
+def _hot_path_indexes(conn: Connection):
+    # Keyset pagination of history and session lists (see app/models)
+    _create_index(conn, "ix_messages_session_created", "messages", "session_id, created_at, id")
+    _create_index(conn, "ix_sessions_user_created", "sessions", "user_id, created_at, id")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "initial schema", _initial_schema),
+    Migration(2, "session rolling summary", _session_summary),
+    Migration(3, "composite indexes for history and session list", _hot_path_indexes, transactional=False),
+]
+
+
+def _applied(conn: Connection) -> set:
+    if not inspect(conn).has_table(VERSION_TABLE.name):
+        return set()
+    return set(conn.scalars(select(VERSION_TABLE.c.version)))
+
+
+async def pending_migrations() -> List[Migration]:
+    async with get_engine().connect() as conn:
+        applied = await conn.run_sync(_applied)
+    return [m for m in MIGRATIONS if m.version not in applied]
+
+
+async def _apply(migration: Migration):
+    engine = get_engine()
+    record = VERSION_TABLE.insert().values(version=migration.version, name=migration.name)
+
+    if migration.transactional:
+        async with engine.begin() as conn:
+            await conn.run_sync(migration.upgrade)
+            await conn.execute(record)
+        return
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.run_sync(migration.upgrade)
+        await conn.execute(record)
+
+
+async def migrate() -> List[Migration]:
+    """
+    Applies pending migrations in version order; returns the ones applied.
+    """
+    engine = get_engine()
+    async with engine.connect() as lock_conn:
+        lock_conn = await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+        postgres = lock_conn.dialect.name == "postgresql"
+        if postgres:
+            await lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": LOCK_KEY})
+
+        try:
+            await lock_conn.run_sync(VERSION_TABLE.create, checkfirst=True)
+
+            applied = []
+            for migration in await pending_migrations():
+                print(f"Applying {migration.version}: {migration.name}")
+                await _apply(migration)
+                applied.append(migration)
+            return applied
+        finally:
+            if postgres:
+                await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": LOCK_KEY})
+
+
+async def _main(status: bool):
+    try:
+        if status:
+            pending = {m.version for m in await pending_migrations()}
+            for m in MIGRATIONS:
+                print(f"{m.version:>4}  {'pending' if m.version in pending else 'applied'}  {m.name}")
+        else:
+            applied = await migrate()
+            print(f"Applied {len(applied)} migration(s)" if applied else "Schema is up to date")
+    finally:
+        await get_engine().dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true", help="list migrations without applying any")
+    asyncio.run(_main(parser.parse_args().status))
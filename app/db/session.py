@@ -1,15 +1,62 @@
 # app/db/session.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from app.core.config import get_settings
 
-settings = get_settings()
+# Sync driver URLs (as in DATABASE_URL) -> their asyncio drivers
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
 
-engine = create_engine(
-    settings.database_url,
-    echo=True,  # prints SQL queries in console; turn off in prod
-)
+_engine: AsyncEngine | None = None
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        return url
+    parsed = parsed.set(drivername=driver)
+    if driver == "postgresql+asyncpg" and "sslmode" in parsed.query:
+        # asyncpg takes libpq's sslmode values under the name "ssl"
+        parsed = parsed.difference_update_query(["sslmode"]).update_query_dict({"ssl": parsed.query["sslmode"]})
+    return parsed.render_as_string(hide_password=False)
+
+
+def get_engine() -> AsyncEngine:
+    """
+    Async engine (and its pool) created on first use, not at import.
+    """
+    global _engine
+    if _engine is None:
+        settings = get_settings()
+        url = async_database_url(settings.database_url)
+
+        pool_options = {}
+        if not url.startswith("sqlite"):
+            pool_options = {
+                "pool_size": settings.db_pool_size,
+                "max_overflow": settings.db_max_overflow,
+                "pool_timeout": settings.db_pool_timeout,
+                "pool_recycle": settings.db_pool_recycle,
+            }
+
+        _engine = create_async_engine(
+            url,
+            echo=settings.debug,  # SQL logging only when debugging
+            pool_pre_ping=settings.db_pool_pre_ping,
+            **pool_options,
+        )
+        SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+# expire_on_commit=False: attributes stay readable after commit without
+# an implicit (and in async, forbidden) refresh
+SessionLocal = async_sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
@@ -0,0 +1,14 @@
+# app/db/types.py
+from sqlalchemy import DateTime
+from sqlalchemy.dialects import sqlite
+
+# Timestamps that keyset cursors compare against (see app/api/pagination.py).
+# SQLite keeps them as text and its CURRENT_TIMESTAMP default has no
+# fractional seconds; bound values must use that exact format, or a row
+# compares unequal to its own cursor and pages repeat forever.
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d",
+    ),
+    "sqlite",
+)
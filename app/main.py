@@ -1,43 +1,90 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.session import engine, Base
+from app.core.config import get_settings
+from app.db.session import get_engine
+from app.db.migrate import pending_migrations
 from app.models import User
 from contextlib import asynccontextmanager
 
 from app.api.auth import router as auth_router
 from app.api.session_routes import router as session_router
-
+from app.utils import metrics
+from app.utils.circuit_breaker import CircuitBreaker
+from app.tools.registry import get_tools
+from app.core.http_client import aclose_http_clients
+from app.core.redis_client import aclose_redis_clients
+from app.core.security import shutdown_hash_pool
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    Base.metadata.create_all(bind=engine)
-    yield
+    # Clients, the LLM and the agent graph are built lazily on first use;
+    # startup only validates config and checks the schema version.
+    # Migrations run separately: python -m app.db.migrate
+    get_settings()
+    pending = await pending_migrations()
+    if pending:
+        print(f"Database schema is {len(pending)} migration(s) behind; run `python -m app.db.migrate`")
 
-app = FastAPI(title="Agentic Workflow Companion", lifespan=lifespan)
+    from app.tools.currency import warm_rate_tables
+    rate_warmer = asyncio.create_task(warm_rate_tables())
+    yield
+    rate_warmer.cancel()
+    await aclose_http_clients()
+    await aclose_redis_clients()
+    shutdown_hash_pool()
+    await get_engine().dispose()
 
-@app.options("/{rest_of_path:path}")
-async def preflight_handler(rest_of_path: str):
-    return {}
 
 origins = [
     "http://localhost:5173",
     "https://agentflow-sy.vercel.app"
 ]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+misc_router = APIRouter()
 
-# routes
-app.include_router(auth_router)
-app.include_router(session_router)
+
+@misc_router.options("/{rest_of_path:path}")
+async def preflight_handler(rest_of_path: str):
+    return {}
 
 
-@app.get("/health")
+@misc_router.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@misc_router.get("/metrics")
+async def get_metrics():
+    return await metrics.snapshot()
+
+
+@misc_router.get("/tools/status")
+async def get_tools_status():
+    """
+    Circuit breaker state of every registered tool.
+    """
+    return {name: await CircuitBreaker(name).status() for name in get_tools()}
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(title="Agentic Workflow Companion", lifespan=lifespan)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # routes
+    app.include_router(misc_router)
+    app.include_router(auth_router)
+    app.include_router(session_router)
+
+    return app
+
+
+app = create_app()
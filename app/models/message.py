@@ -1,11 +1,16 @@
 # app/models/message.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, func
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, JSON, func
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.db.types import Timestamp
 
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # history pages: WHERE session_id = ? ORDER BY created_at, id
+        Index("ix_messages_session_created", "session_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -14,7 +19,7 @@ class Message(Base):
     content = Column(String, nullable=False)
     meta = Column(JSON, nullable=True)  # tool calls, step details, etc.
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
 
     # Relationship
     session = relationship("Session", back_populates="messages")
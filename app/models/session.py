@@ -1,11 +1,16 @@
 # app/models/session.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.db.types import Timestamp
 
 
 class Session(Base):
     __tablename__ = "sessions"
+    __table_args__ = (
+        # session list: WHERE user_id = ? ORDER BY created_at, id
+        Index("ix_sessions_user_created", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -13,7 +18,10 @@ class Session(Base):
     title = Column(String, nullable=True)  # optional, can auto-generate
     status = Column(String, default="active")  # active / completed / archived
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Rolling summary of turns that fell out of the context window
+    summary = Column(Text, nullable=True)
+
+    created_at = Column(Timestamp, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationship
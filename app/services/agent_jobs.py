@@ -0,0 +1,126 @@
+# app/services/agent_jobs.py
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from rq import Queue
+from rq.exceptions import NoSuchJobError
+from rq.job import Job, JobStatus
+
+from app.core.config import get_settings
+from app.core.redis_client import get_redis_raw_client
+from app.db.session import SessionLocal, get_engine
+from app.models.message import Message
+from app.models.session import Session as SessionModel
+from app.services.turn_service import complete_turn
+
+# Agent turns as rq jobs: the web worker enqueues and answers 202 with a
+# job id, worker processes (python -m app.worker) run the turn and store
+# both messages, clients poll GET /sessions/{id}/jobs/{job_id}.
+FINAL_STATUSES = {s.value for s in (JobStatus.FINISHED, JobStatus.FAILED, JobStatus.STOPPED, JobStatus.CANCELED)}
+
+POLL_INTERVAL = 0.25
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_agent_queue() -> Queue:
+    # rq needs a binary (non-decoding) connection
+    return Queue(get_settings().agent_job_queue, connection=get_redis_raw_client())
+
+
+def _message_dict(msg: Message) -> Dict[str, Any]:
+    return {
+        "id": msg.id,
+        "sender": msg.sender,
+        "content": msg.content,
+        "meta": msg.meta,
+        "created_at": msg.created_at.isoformat() if msg.created_at else None,
+    }
+
+
+async def _run_turn(session_id: int, content: str, budget: Dict | None, use_cache: bool) -> Dict[str, Any]:
+    get_engine()  # binds SessionLocal on first use
+    async with SessionLocal() as db:
+        session = await db.get(SessionModel, session_id)  # ownership was checked on enqueue
+        if session is None:
+            raise LookupError(f"Session {session_id} no longer exists")
+
+        user_msg, assistant_msg = await complete_turn(db, session, content, budget=budget, use_cache=use_cache)
+
+    return {"user_message": _message_dict(user_msg), "assistant_message": _message_dict(assistant_msg)}
+
+
+def run_turn_job(session_id: int, content: str, budget: Dict | None = None, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    rq entry point (sync). Uses one event loop per worker process: the
+    lazily built async clients (Redis, HTTP, DB pool, LLM) are bound to
+    the loop that created them, so they are reused from job to job.
+    """
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+
+    task = _loop.create_task(_run_turn(session_id, content, budget, use_cache))
+    try:
+        return _loop.run_until_complete(task)
+    except BaseException:
+        # rq's job timeout (SIGALRM) interrupts the loop, not the task:
+        # cancel it here, or it would resume during the next job
+        task.cancel()
+        _loop.run_until_complete(asyncio.gather(task, return_exceptions=True))
+        raise
+
+
+def enqueue_turn(session_id: int, user_id: int, content: str, budget: Dict | None, use_cache: bool) -> Job:
+    """
+    Blocking (sync Redis); call via asyncio.to_thread on the event loop.
+    """
+    settings = get_settings()
+    return get_agent_queue().enqueue(
+        run_turn_job,
+        session_id, content, budget, use_cache,
+        job_timeout=settings.agent_job_timeout_seconds,
+        result_ttl=settings.agent_job_result_ttl_seconds,
+        failure_ttl=settings.agent_job_result_ttl_seconds,
+        meta={"session_id": session_id, "user_id": user_id},
+    )
+
+
+def _snapshot(job_id: str) -> Optional[Dict[str, Any]]:
+    # Blocking (sync Redis), run in a thread
+    try:
+        job = Job.fetch(job_id, connection=get_redis_raw_client())
+    except NoSuchJobError:
+        return None
+
+    status = job.get_status(refresh=False)
+    error = None
+    if status == JobStatus.FAILED:
+        result = job.latest_result()
+        # Last traceback line only: exception type and message
+        lines = (result.exc_string or "").strip().splitlines() if result else []
+        error = lines[-1] if lines else "Agent run failed"
+
+    return {
+        "job_id": job.id,
+        "status": status.value if status else None,
+        "result": job.return_value() if status == JobStatus.FINISHED else None,
+        "error": error,
+        "session_id": job.meta.get("session_id"),
+        "user_id": job.meta.get("user_id"),
+    }
+
+
+async def job_status(job_id: str, wait: float = 0.0) -> Optional[Dict[str, Any]]:
+    """
+    Job state for polling; with `wait`, long-polls up to that many seconds
+    for the job to finish. None if the job is unknown or expired.
+    """
+    deadline = time.monotonic() + wait
+    while True:
+        snapshot = await asyncio.to_thread(_snapshot, job_id)
+        if snapshot is None or snapshot["status"] in FINAL_STATUSES or time.monotonic() >= deadline:
+            return snapshot
+        await asyncio.sleep(POLL_INTERVAL)
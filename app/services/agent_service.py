@@ -1,12 +1,23 @@
 # app/services/agent_service.py
 
-from typing import List, Dict
+from contextlib import aclosing
+from typing import List, Dict, AsyncIterator, Awaitable, Callable, Tuple
 
-from langchain_core.messages import HumanMessage, AIMessage
-from app.agents.multi_agent_graph import multi_agent_app
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, RemoveMessage, ToolMessage
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+from langgraph.types import StateSnapshot
+from app.core.config import get_settings
+from app.agents.multi_agent_graph import get_multi_agent_app, NODE_NAMES, ANSWER_NODES
+from app.services.context_manager import fit_context, split_window, window_budget
+from app.agents.budget import new_budget, exhausted_reason
+from app.services.answer_cache import (
+    answer_cache_key, get_cached_answer, store_answer, tools_used_in_turn
+)
 
+from app.utils import metrics
 
-def run_multi_agent(conversation: List[Dict[str, str]]) -> str:
+
+def _to_lc_messages(conversation: List[Dict[str, str]]):
 
     lc_messages = []
     for msg in conversation:
@@ -18,10 +29,243 @@ def run_multi_agent(conversation: List[Dict[str, str]]) -> str:
         else:
             lc_messages.append(AIMessage(content=content))
 
-    final_state = multi_agent_app.invoke({
-        "messages": lc_messages
-    })
+    return lc_messages
+
+
+def tool_runs_in_turn(messages: List[BaseMessage]) -> List[Dict]:
+    """
+    Every tool call of the last turn with its full (uncompacted) result,
+    for auditing in the stored assistant message's meta.
+    """
+    start = 0
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            start = i + 1
+            break
+
+    args_by_id, runs = {}, []
+    for msg in messages[start:]:
+        if isinstance(msg, AIMessage):
+            args_by_id.update({call["id"]: call["args"] for call in msg.tool_calls})
+        elif isinstance(msg, ToolMessage):
+            runs.append({
+                "tool": msg.name,
+                "args": args_by_id.get(msg.tool_call_id),
+                "result": msg.artifact if msg.artifact is not None else msg.content,
+            })
+    return runs
+
+
+def thread_config(session_id: int) -> dict:
+    return {"configurable": {"thread_id": str(session_id)}}
+
+
+async def _prepare_turn(
+    session_id: int,
+    content: str,
+    summary: str | None,
+    load_history: Callable[[], Awaitable[List[Dict[str, str]]]] | None,
+    budget: Dict | None = None,
+) -> Tuple[dict, dict, List[BaseMessage], StateSnapshot]:
+    """
+    Builds the graph input for one turn and returns it with the thread
+    config, the context window the agents will see and the thread's state
+    before the turn. The thread checkpoint already holds the conversation
+    (incl. planner/tool messages) and its rolling summary, so only the new
+    HumanMessage is appended. Turns that no longer fit the context budget
+    are folded into the summary and removed from the thread.
+
+    `load_history` and `summary` (both from the DB) seed a thread that has
+    no checkpoint yet (sessions created before checkpointing, or an expired
+    thread); stored turns the summary already covers are left out.
+    `budget` holds per-request overrides of the run budget limits.
+    """
+
+    config = thread_config(session_id)
+    snapshot = await get_multi_agent_app().aget_state(config)
+    history = list(snapshot.values.get("messages", []))
+
+    seeded = not history and load_history is not None
+    if seeded:
+        history = _to_lc_messages(await load_history())
+    elif history:
+        summary = snapshot.values.get("summary")
+
+    new_msg = HumanMessage(content=content)
+    conversation = history + [new_msg]
+    if seeded and summary:
+        # Stored turns that don't fit next to the summary are already in it
+        conversation = split_window(conversation, window_budget(summary))[1]
+
+    window, summary, evicted = await fit_context(conversation, summary)
+
+    if seeded:
+        updates = window
+    else:
+        updates = [RemoveMessage(id=m.id) for m in evicted] + [new_msg]
+
+    graph_input = {"messages": updates, "summary": summary, "budget": new_budget(**(budget or {}))}
+    return graph_input, config, window, snapshot
+
+
+async def _restore_thread(config: dict, before: StateSnapshot):
+    """
+    Puts the thread back to its state before a failed or cancelled turn
+    (nothing of which was stored in the DB): evicted turns, the summary
+    and no dangling question or unanswered tool calls.
+    """
+    app = get_multi_agent_app()
+    try:
+        messages = before.values.get("messages")
+        if not messages:
+            # Thread was seeded by this turn; the next one seeds it again
+            await app.checkpointer.adelete_thread(config["configurable"]["thread_id"])
+            return
+
+        await app.aupdate_state(
+            config,
+            {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES)] + messages, "summary": before.values.get("summary")},
+            as_node=ANSWER_NODES[0],
+        )
+    except Exception as e:
+        print("Thread restore failed:", e)
+
+
+async def _answer_cache_active(use_cache: bool) -> bool:
+    if not get_settings().answer_cache_enabled:
+        return False
+    if not use_cache:
+        await metrics.incr("answer_cache.bypass")
+    return use_cache
+
+
+async def _lookup_answer(graph_input: dict, config: dict, window: List[BaseMessage]) -> Tuple[str, str | None]:
+    """
+    Answer cache lookup. On a hit the turn is recorded on the thread
+    without running the graph. Returns (cache key, cached answer or None).
+    """
+
+    key = answer_cache_key(graph_input["summary"], window)
+    answer = await get_cached_answer(key)
+
+    if answer is not None:
+        await get_multi_agent_app().aupdate_state(
+            config,
+            {**graph_input, "messages": graph_input["messages"] + [AIMessage(content=answer)]},
+            as_node=ANSWER_NODES[0],
+        )
+
+    return key, answer
+
+
+async def _store_answer(key: str, final_state: dict):
+    # Partial answers from a run that ran out of budget are not reused
+    if exhausted_reason(final_state.get("budget")) is not None:
+        return
+
+    messages = final_state["messages"]
+    await store_answer(key, messages[-1].content, tools_used_in_turn(messages))
+
+
+async def run_multi_agent(
+    session_id: int,
+    content: str,
+    summary: str | None = None,
+    load_history: Callable[[], Awaitable[List[Dict[str, str]]]] | None = None,
+    budget: Dict | None = None,
+    use_cache: bool = True,
+) -> Tuple[str, str | None, List[Dict]]:
+    """
+    Runs one turn on the session's thread.
+    Returns (assistant reply, rolling summary after this turn, tool runs).
+
+    With ANSWER_CACHE_ENABLED, identical contexts are answered from the
+    answer cache unless `use_cache` is False (per-request bypass).
+    """
+
+    graph_input, config, window, before = await _prepare_turn(session_id, content, summary, load_history, budget)
+
+    try:
+        cache_key = None
+        if await _answer_cache_active(use_cache):
+            cache_key, answer = await _lookup_answer(graph_input, config, window)
+            if answer is not None:
+                return answer, graph_input["summary"], []
+
+        final_state = await get_multi_agent_app().ainvoke(graph_input, config)
+    except BaseException:
+        await _restore_thread(config, before)
+        raise
+
+    if cache_key:
+        await _store_answer(cache_key, final_state)
+
+    messages = final_state["messages"]
+
+    return messages[-1].content, graph_input["summary"], tool_runs_in_turn(messages)
+
+
+async def stream_multi_agent(
+    session_id: int,
+    content: str,
+    summary: str | None = None,
+    load_history: Callable[[], Awaitable[List[Dict[str, str]]]] | None = None,
+    budget: Dict | None = None,
+    use_cache: bool = True,
+) -> AsyncIterator[Dict]:
+    """
+    Streams a run as events:
+        {"event": "node", "data": {"node": "planner", "status": "start" | "end"}}
+        {"event": "token", "data": {"content": "..."}}   # final-answer tokens
+        {"event": "final", "data": {"content": "...", "summary": "...", "tools": [...]}}   # always last
+    """
+
+    graph_input, config, window, before = await _prepare_turn(session_id, content, summary, load_history, budget)
+
+    # Failures and client disconnects (GeneratorExit, cancellation) before
+    # the final event has been consumed leave the thread as it was
+    try:
+        cache_key = None
+        if await _answer_cache_active(use_cache):
+            cache_key, answer = await _lookup_answer(graph_input, config, window)
+            if answer is not None:
+                yield {"event": "final", "data": {"content": answer, "summary": graph_input["summary"], "tools": []}}
+                return
+
+        final_content = ""
+
+        # Closed before any restore, so no graph step outlives the turn
+        async with aclosing(get_multi_agent_app().astream_events(graph_input, config, version="v2")) as events:
+            async for event in events:
+                kind = event["event"]
+                node = event.get("metadata", {}).get("langgraph_node")
+
+                if kind in ("on_chain_start", "on_chain_end") and event["name"] in NODE_NAMES and node == event["name"]:
+                    yield {
+                        "event": "node",
+                        "data": {"node": node, "status": "start" if kind == "on_chain_start" else "end"},
+                    }
+
+                    if kind == "on_chain_end" and node in ANSWER_NODES:
+                        final_content = event["data"]["output"]["messages"][-1].content
+
+                elif kind == "on_chat_model_stream" and node in ANSWER_NODES:
+                    chunk = event["data"]["chunk"].content
+                    if chunk:
+                        yield {"event": "token", "data": {"content": chunk}}
 
-    last_msg = final_state["messages"][-1]
+        snapshot = await get_multi_agent_app().aget_state(config)
+        if cache_key:
+            await _store_answer(cache_key, snapshot.values)
 
-    return last_msg.content
\ No newline at end of file
+        yield {
+            "event": "final",
+            "data": {
+                "content": final_content,
+                "summary": graph_input["summary"],
+                "tools": tool_runs_in_turn(snapshot.values["messages"]),
+            },
+        }
+    except BaseException:
+        await _restore_thread(config, before)
+        raise
@@ -0,0 +1,84 @@
+# app/services/answer_cache.py
+import re
+from typing import List, Optional
+
+import xxhash
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
+
+from app.core.config import get_settings
+from app.utils.cache import acache_get, acache_set
+from app.utils import metrics
+
+# Answer TTL per tool used in the run (seconds); the shortest one wins.
+# 0 means answers that used the tool are never cached.
+TOOL_ANSWER_TTLS = {
+    "get_current_datetime": 0,
+    "get_news": 300,
+    "get_weather": 600,
+    "get_weather_batch": 600,
+    "web_search": 1800,
+    "currency_convert": 1800,
+    "currency_convert_bulk": 1800,
+    "translate_language": 24 * 3600,
+    "translate_batch": 24 * 3600,
+}
+
+
+def _normalize(text: str) -> str:
+    text = re.sub(r"\s+", " ", str(text).strip().lower())
+    return text.rstrip("?.! ")
+
+
+def answer_cache_key(summary: Optional[str], window: List[BaseMessage]) -> str:
+    """
+    Hash of the context that determines the answer: rolling summary plus
+    the user/assistant turns in the window (tool traffic excluded).
+    """
+    parts = [_normalize(summary or "")]
+
+    for msg in window:
+        if isinstance(msg, HumanMessage):
+            parts.append("u:" + _normalize(msg.content))
+        elif isinstance(msg, AIMessage) and msg.content and not msg.tool_calls:
+            parts.append("a:" + _normalize(msg.content))
+
+    return "answer:" + xxhash.xxh3_128_hexdigest("\x1f".join(parts))
+
+
+def answer_ttl(tools_used: List[str]) -> int:
+    """
+    TTL for an answer produced with the given tools (0 = don't cache).
+    """
+    ttl = get_settings().answer_cache_ttl_seconds
+    for name in tools_used:
+        ttl = min(ttl, TOOL_ANSWER_TTLS.get(name, 0))
+    return ttl
+
+
+def tools_used_in_turn(messages: List[BaseMessage]) -> List[str]:
+    """
+    Names of the tools that ran after the last user message.
+    """
+    names = []
+    for msg in reversed(messages):
+        if isinstance(msg, HumanMessage):
+            break
+        if isinstance(msg, ToolMessage):
+            names.append(msg.name)
+    return names
+
+
+async def get_cached_answer(key: str) -> Optional[str]:
+    answer = await acache_get(key)
+    await metrics.incr("answer_cache.hit" if answer is not None else "answer_cache.miss")
+    return answer
+
+
+async def store_answer(key: str, answer: str, tools_used: List[str]):
+    ttl = answer_ttl(tools_used)
+    if ttl <= 0 or not answer:
+        await metrics.incr("answer_cache.skip")
+        return
+
+    await acache_set(key, answer, ttl=ttl)
+    await metrics.incr("answer_cache.store")
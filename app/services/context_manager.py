@@ -0,0 +1,132 @@
+# app/services/context_manager.py
+from functools import lru_cache
+from typing import List, Tuple
+
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage, ToolMessage
+
+from app.core.config import get_settings
+from app.utils.tokens import count_tokens, MESSAGE_OVERHEAD_TOKENS
+
+
+@lru_cache
+def get_summarizer_llm():
+    """
+    Plain (tool-less) model used to fold old turns into the rolling summary.
+    """
+    from langchain_groq import ChatGroq  # slow import, deferred to first use
+
+    return ChatGroq(
+        model="openai/gpt-oss-120b",
+        api_key=get_settings().groq_api_key,
+        temperature=0,
+    )
+
+
+def message_tokens(msg: BaseMessage) -> int:
+    tokens = count_tokens(str(msg.content)) + MESSAGE_OVERHEAD_TOKENS
+
+    tool_calls = getattr(msg, "tool_calls", None)
+    if tool_calls:
+        tokens += count_tokens(str(tool_calls))
+
+    return tokens
+
+
+def split_window(conversation: List[BaseMessage], budget: int) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+    """
+    Splits the conversation into (older, recent) where recent is the
+    longest suffix that fits in `budget` tokens and starts on a user turn.
+    The latest message is always kept, even if it exceeds the budget.
+    """
+
+    used = 0
+    start = len(conversation)
+
+    for i in range(len(conversation) - 1, -1, -1):
+        used += message_tokens(conversation[i])
+        if used > budget and i < len(conversation) - 1:
+            break
+        start = i
+
+    # Never open the window mid-turn (assistant reply or orphan tool result)
+    while start < len(conversation) - 1 and not isinstance(conversation[start], HumanMessage):
+        start += 1
+
+    return conversation[:start], conversation[start:]
+
+
+def _transcript_line(msg: BaseMessage) -> str | None:
+    if isinstance(msg, HumanMessage):
+        return f"USER: {msg.content}"
+    if isinstance(msg, ToolMessage):
+        return f"TOOL {msg.name}: {str(msg.content)[:500]}"
+    if msg.content:
+        return f"ASSISTANT: {msg.content}"
+    return None  # tool-call only message
+
+
+async def refresh_summary(previous_summary: str | None, older: List[BaseMessage]) -> str:
+    """
+    Folds newly evicted turns into the existing summary (incremental,
+    the previous summary is never recomputed from scratch).
+    """
+
+    transcript = "\n".join(
+        line for line in map(_transcript_line, older) if line
+    )
+
+    prompt = [
+        SystemMessage(
+            content=("""
+                You maintain a running summary of a conversation between a user and an assistant.
+                Update the summary with the new turns below.
+                - Keep facts, user preferences, names, numbers and open questions.
+                - Drop greetings, filler and anything already superseded.
+                - Write plain prose, at most 200 words.
+                - Return ONLY the updated summary.
+                """
+            )
+        ),
+        HumanMessage(
+            content=(
+                f"CURRENT SUMMARY:\n{previous_summary or '(empty)'}\n\n"
+                f"NEW TURNS:\n{transcript}"
+            )
+        ),
+    ]
+
+    result = await get_summarizer_llm().ainvoke(prompt)
+    return result.content.strip()
+
+
+def window_budget(summary: str | None, budget: int | None = None) -> int:
+    """
+    Tokens left for messages once the summary is in the prompt.
+    """
+    return (budget or get_settings().context_token_budget) - count_tokens(summary or "")
+
+
+async def fit_context(
+    conversation: List[BaseMessage],
+    summary: str | None,
+    budget: int | None = None,
+) -> Tuple[List[BaseMessage], str | None, List[BaseMessage]]:
+    """
+    Keeps the most recent turns within the token budget.
+
+    Returns (window, summary, evicted). When turns are evicted the summary
+    is refreshed with them; the caller drops them from the thread state
+    and persists the new summary.
+    """
+
+    older, recent = split_window(conversation, window_budget(summary, budget))
+
+    if older:
+        try:
+            summary = await refresh_summary(summary, older)
+        except Exception as e:
+            # Keep the old summary; the same turns are retried next time
+            print("Summary refresh failed:", e)
+            return recent, summary, []
+
+    return recent, summary, older
@@ -1,14 +1,22 @@
 # app/services/llm_service.py
-from openai import OpenAI
-from groq import Groq
 from app.core.config import get_settings
 
-settings = get_settings()
-
 # Using Groq free api for testing & developent!
 
-# client = OpenAI(api_key=settings.openai_api_key)
-client = Groq(api_key=settings.groq_api_key)
+_client = None
+
+
+def get_client():
+    """
+    Created on first use so importing the app needs neither GROQ_API_KEY
+    nor the (slow to import) SDK.
+    """
+    global _client
+    if _client is None:
+        from groq import AsyncGroq
+        # from openai import OpenAI; _client = OpenAI(api_key=get_settings().openai_api_key)
+        _client = AsyncGroq(api_key=get_settings().groq_api_key)
+    return _client
 
 async def generate_llm_response(messages: list[dict]) -> str:
     """
@@ -19,7 +27,7 @@ async def generate_llm_response(messages: list[dict]) -> str:
     ]
     """
     try:
-        completion = client.chat.completions.create(
+        completion = await get_client().chat.completions.create(
             # model="gpt-4o-mini",
             model="llama-3.3-70b-versatile",
             messages=messages,
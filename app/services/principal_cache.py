@@ -0,0 +1,129 @@
+# app/services/principal_cache.py
+import time
+from dataclasses import asdict, dataclass
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.redis_client import get_async_redis_raw_client
+from app.models.user import User
+from app.utils.cache import LocalTTLCache, acache_get_many, acache_set
+
+# Resolving the user behind a token, cheapest source first:
+#     1. this process           _principals[jti]      (AUTH_CACHE_LOCAL_TTL_SECONDS)
+#     2. Redis, one round trip  auth:revoked:{jti}    set on logout until the token expires
+#                               auth:principal:{id}   written on DB load / user update
+#     3. the token's own claims (email, name)         tokens issued since claims were added
+#     4. the users table                              older tokens with only "sub"
+REVOKED_KEY = "auth:revoked:{}"
+PRINCIPAL_KEY = "auth:principal:{}"
+
+_principals = LocalTTLCache()
+
+
+class TokenRevoked(Exception):
+    """
+    The token was logged out.
+    """
+
+
+class UnknownUser(Exception):
+    """
+    The token's subject no longer exists.
+    """
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated user as routes see it (no ORM object, no DB access).
+    """
+    id: int
+    email: str
+    fullname: str
+
+
+def _local_key(claims: dict) -> str:
+    return claims.get("jti") or f"user:{claims['sub']}"
+
+
+def _principal_ttl() -> int:
+    return get_settings().access_token_expire_minutes * 60
+
+
+async def store_principal(user: User) -> Principal:
+    """
+    Caches the user's current data for all workers. Call after updating
+    a user, so tokens carrying the old claims stop being authoritative.
+    """
+    principal = Principal(id=user.id, email=user.email, fullname=user.fullname)
+    try:
+        await acache_set(PRINCIPAL_KEY.format(user.id), asdict(principal), ttl=_principal_ttl())
+    except Exception as e:
+        print("Principal cache error:", e)
+    return principal
+
+
+async def invalidate_principal(user_id: int):
+    """
+    Drops the user's shared entry; other workers' local copies expire
+    within AUTH_CACHE_LOCAL_TTL_SECONDS.
+    """
+    _principals.delete(f"user:{user_id}")
+    try:
+        await get_async_redis_raw_client().delete(PRINCIPAL_KEY.format(user_id))
+    except Exception as e:
+        print("Principal cache error:", e)
+
+
+async def revoke_token(claims: dict):
+    """
+    Logout: rejects this token (by jti) until it would have expired anyway.
+    """
+    jti = claims.get("jti")
+    if jti:
+        _principals.delete(jti)
+        ttl = int(claims.get("exp", 0) - time.time())
+        if ttl > 0:
+            try:
+                await acache_set(REVOKED_KEY.format(jti), 1, ttl=ttl)
+            except Exception as e:
+                print("Principal cache error:", e)
+
+    await invalidate_principal(int(claims["sub"]))
+
+
+async def resolve_principal(claims: dict, db: AsyncSession) -> Principal:
+    """
+    Principal for decoded, signature-checked JWT claims.
+    Raises TokenRevoked / UnknownUser.
+    """
+    local_key = _local_key(claims)
+    principal = _principals.get(local_key)
+    if principal is not None:
+        return principal
+
+    user_id, jti = int(claims["sub"]), claims.get("jti")
+    cached = None
+    try:
+        revoked, cached = await acache_get_many([REVOKED_KEY.format(jti or "-"), PRINCIPAL_KEY.format(user_id)])
+        if revoked:
+            raise TokenRevoked()
+    except TokenRevoked:
+        raise
+    except Exception as e:
+        # Redis down: authenticate from the token / DB without revocation checks
+        print("Principal cache error:", e)
+
+    if isinstance(cached, dict):
+        principal = Principal(**cached)
+    elif "email" in claims and "name" in claims:
+        principal = Principal(id=user_id, email=claims["email"], fullname=claims["name"])
+    else:
+        user = await db.get(User, user_id)
+        if user is None:
+            raise UnknownUser()
+        principal = await store_principal(user)
+
+    _principals.set(local_key, principal, get_settings().auth_cache_local_ttl_seconds)
+    return principal
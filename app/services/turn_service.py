@@ -0,0 +1,96 @@
+# app/services/turn_service.py
+from typing import Dict, List, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.message import Message
+from app.models.session import Session as SessionModel
+from app.services.agent_service import run_multi_agent
+
+# Persistence of chat turns, shared by the HTTP routes and the agent job
+# worker (app/services/agent_jobs.py).
+
+
+async def store_messages(db: AsyncSession, session_id: int, *messages: tuple) -> List[Message]:
+    """
+    Inserts (sender, content, meta) rows with one INSERT ... RETURNING and
+    commits them together with pending session changes (e.g. the summary).
+    """
+
+    rows = await db.scalars(
+        insert(Message).returning(Message, sort_by_parameter_order=True),
+        [
+            {"session_id": session_id, "sender": sender, "content": content, "meta": meta}
+            for sender, content, meta in messages
+        ],
+    )
+    stored = rows.all()
+    await db.commit()
+
+    return stored
+
+
+async def release_connection(db: AsyncSession):
+    # Ends the read transaction so the pooled connection isn't held for
+    # the whole agent run (loaded objects stay usable: expire_on_commit=False)
+    await db.commit()
+
+
+async def load_history(db: AsyncSession, session: SessionModel, before_id: int | None = None) -> List[Dict[str, str]]:
+    """
+    Stored turns of the session, oldest first. Only used to seed a
+    session's agent thread when it has no checkpoint; turns the rolling
+    summary already covers are dropped there (see _prepare_turn).
+    """
+
+    query = select(Message.sender, Message.content).where(Message.session_id == session.id)
+    if before_id is not None:
+        query = query.where(Message.id < before_id)
+
+    # (session_id, created_at, id) order: served by ix_messages_session_created
+    rows = await db.execute(query.order_by(Message.created_at.asc(), Message.id.asc()))
+    await release_connection(db)
+
+    return [
+        {
+            "role": "user" if sender == "user" else "assistant",
+            "content": content
+        }
+        for sender, content in rows.all()
+    ]
+
+
+async def complete_turn(
+    db: AsyncSession,
+    session: SessionModel,
+    content: str,
+    budget: Dict | None = None,
+    use_cache: bool = True,
+) -> Tuple[Message, Message]:
+    """
+    Runs the agents on `content`, then stores the user and assistant
+    messages (and the refreshed summary) in one transaction. A failed run
+    stores nothing. Returns (user message, assistant message).
+    """
+    await release_connection(db)
+
+    # History lives in the session's agent thread (checkpointer);
+    # the DB is only read to seed a thread that has none.
+    assistant_reply, summary, tool_runs = await run_multi_agent(
+        session.id,
+        content,
+        session.summary,
+        load_history=lambda: load_history(db, session),
+        budget=budget,
+        use_cache=use_cache,
+    )
+
+    # Full tool outputs are kept in meta for auditing
+    session.summary = summary
+    user_msg, assistant_msg = await store_messages(
+        db, session.id,
+        ("user", content, None),
+        ("assistant", assistant_reply, {"tools": tool_runs} if tool_runs else None),
+    )
+    return user_msg, assistant_msg
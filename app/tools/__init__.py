@@ -1,6 +1,2 @@
-from .datetime import *
-from .web_search import *
-from .weather import *
-from .news import *
-from .currency import *
-from .translate import *
\ No newline at end of file
+# app/tools/__init__.py
+# Tool modules are imported on demand by registry.get_tools()
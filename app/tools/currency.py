@@ -1,27 +1,113 @@
 # app/tools/currency.py
-import requests
+import asyncio
+from typing import Dict, List
+
+from typing_extensions import TypedDict  # pydantic needs it on Python < 3.12
+
+from app.core.config import get_settings
+from app.core.http_client import aget_json
 from app.tools.registry import register_tool
-from app.utils.cache import cache_get, cache_set
+from app.utils.cache import cached
+
+
+# Active ISO 4217 codes (+ gold and silver), as quoted by the rates API
+CURRENCY_CODES = frozenset("""
+    AED AFN ALL AMD ANG AOA ARS AUD AWG AZN BAM BBD BDT BGN BHD BIF BMD BND BOB BRL
+    BSD BTN BWP BYN BZD CAD CDF CHF CLP CNY COP CRC CUP CVE CZK DJF DKK DOP DZD EGP
+    ERN ETB EUR FJD FKP GBP GEL GHS GIP GMD GNF GTQ GYD HKD HNL HTG HUF IDR ILS INR
+    IQD IRR ISK JMD JOD JPY KES KGS KHR KMF KPW KRW KWD KYD KZT LAK LBP LKR LRD LSL
+    LYD MAD MDL MGA MKD MMK MNT MOP MRU MUR MVR MWK MXN MYR MZN NAD NGN NIO NOK NPR
+    NZD OMR PAB PEN PGK PHP PKR PLN PYG QAR RON RSD RUB RWF SAR SBD SCR SDG SEK SGD
+    SHP SLE SOS SRD SSP STN SVC SYP SZL THB TJS TMT TND TOP TRY TTD TWD TZS UAH UGX
+    USD UYU UZS VES VND VUV WST XAF XAG XAU XCD XOF XPF YER ZAR ZMW ZWL
+""".split())
+
+
+def rate_bases() -> List[str]:
+    """
+    Rate tables kept warm; the first one is the pivot for cross rates.
+    """
+    bases = [b.strip().upper() for b in get_settings().currency_rate_bases.split(",") if b.strip()]
+    return bases or ["USD"]
+
+
+class Conversion(TypedDict):
+    amount: float
+    from_currency: str
+    to_currency: str
+
+
+@cached("currency:rates", ttl=3600, stale_ttl=3600)  # 1 hour
+async def _fetch_rates(base: str) -> Dict[str, float]:
+    """
+    Rate table {currency: units per 1 `base`}.
+    """
+    url = "https://api.exchangerate.host/latest"
+    data = await aget_json(url, params={"base": base})
+
+    rates = data.get("rates") or {}
+    if not rates:
+        raise ValueError(f"No rates returned for {base}")
+    return {**rates, base: 1.0}
+
+
+async def get_rate(from_currency: str, to_currency: str) -> float:
+    """
+    Units of `to_currency` per 1 `from_currency`: read directly from a
+    kept-warm table when `from_currency` has one, otherwise derived from
+    the pivot table so any pair costs at most one (shared) upstream call.
+    """
+    from_currency, to_currency = from_currency.upper(), to_currency.upper()
+    if from_currency == to_currency:
+        return 1.0
+
+    bases = rate_bases()
+    base = from_currency if from_currency in bases else bases[0]
+    rates = await _fetch_rates(base)
+
+    for code in (from_currency, to_currency):
+        if code not in rates:
+            raise ValueError(f"Unsupported currency: {code}")
+    return rates[to_currency] / rates[from_currency]
+
+
+async def warm_rate_tables():
+    """
+    Background loop (started by the app lifespan) refreshing the
+    rate_bases() tables before they go stale; one worker refreshes per tick.
+    """
+    interval = get_settings().currency_refresh_seconds
+    while True:
+        for base in rate_bases():
+            try:
+                await _fetch_rates.warm(base, min_interval=interval * 0.9)
+            except Exception as e:
+                print("Rate refresh failed:", base, e)
+        await asyncio.sleep(interval)
+
 
 @register_tool("currency_convert")
-def currency_convert(amount: float, from_currency: str, to_currency: str):
+async def currency_convert(amount: float, from_currency: str, to_currency: str):
     """
     Convert currency using exchangerate.host (free).
     """
 
-    key = f"currency:{amount}:{from_currency}:{to_currency}"
-    cached = cache_get(key)
-    if cached:
-        return cached
+    return round(amount * await get_rate(from_currency, to_currency), 6)
 
-    url = f"https://api.exchangerate.host/convert?from={from_currency}&to={to_currency}&amount={amount}"
 
-    try:
-        result = requests.get(url).json().get("result")
+@register_tool("currency_convert_bulk")
+async def currency_convert_bulk(conversions: List[Conversion]):
+    """
+    Convert several amounts/currency pairs in one call.
+    Returns one {amount, from_currency, to_currency, result} per item.
+    """
+
+    async def convert(item: Conversion):
+        try:
+            rate = await get_rate(item["from_currency"], item["to_currency"])
+            return {**item, "result": round(item["amount"] * rate, 6)}
+        except Exception as e:
+            return {**item, "error": str(e)}
 
-        cache_set(key, result, ttl=3600)  # 1 hour
-        
-        return result
-    
-    except Exception as e:
-        return {"error": str(e)}
+    # Items sharing a table coalesce on the same cache fill
+    return list(await asyncio.gather(*(convert(item) for item in conversions)))
@@ -3,7 +3,7 @@ from datetime import datetime
 from app.tools.registry import register_tool
 
 @register_tool("get_current_datetime")
-def get_current_datetime(format: str = "%Y-%m-%d %H:%M:%S"):
+async def get_current_datetime(format: str = "%Y-%m-%d %H:%M:%S"):
 
     """Return the current datetime in the given format."""
     
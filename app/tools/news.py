@@ -1,31 +1,23 @@
 # app/tools/news.py
-import requests
+from app.core.http_client import aget_json
 from app.tools.registry import register_tool
-from app.utils.cache import cache_get, cache_set
+from app.utils.cache import cached
+
+@cached("news", ttl=600, stale_ttl=600)  # 10 minutes fresh, 10 more stale
+async def _fetch_news(query: str, max_results: int):
+    url = "https://gnews.io/api/v4/search"
+    params = {"q": query, "lang": "en", "max": max_results, "token": "demo"}
+    data = (await aget_json(url, params=params)).get("articles", [])
+
+    return [
+        {"title": a["title"], "description": a["description"], "url": a["url"]}
+        for a in data
+    ]
 
 @register_tool("get_news")
-def get_news(query: str, max_results: int = 5):
+async def get_news(query: str, max_results: int = 5):
     """
     Fetch simple news using gNews (free).
     """
 
-    key = f"news:{query}:{max_results}"
-    cached = cache_get(key)
-    if cached:
-        return cached
-
-    try:
-        url = f"https://gnews.io/api/v4/search?q={query}&lang=en&max={max_results}&token=demo"
-        data = requests.get(url).json().get("articles", [])
-
-        articles = [
-            {"title": a["title"], "description": a["description"], "url": a["url"]}
-            for a in data
-        ]
-
-        cache_set(key, articles, ttl=600)  # 10 minutes
-        
-        return articles
-    
-    except Exception as e:
-        return {"error": str(e)}
+    return await _fetch_news(query, max_results)
@@ -1,18 +1,137 @@
 # app/tools/registry.py
-from typing import Any, Dict, Callable
-from langchain_core.tools import tool
+import asyncio
+import functools
+import importlib
+import inspect
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, Callable, Optional
+
+import httpx
+from langchain_core.tools import BaseTool, tool
+
+from app.core.config import get_settings
+from app.core.deadline import DeadlineExceeded, deadline_scope, time_left
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+# Modules whose @register_tool functions make up the agent toolset
+TOOL_MODULES = ("datetime", "web_search", "weather", "news", "currency", "translate")
 
 TOOLS_REGISTRY: Dict[str, Callable[..., Any]] = {}
 
 
 def register_tool(name: str):
     """
-    Decorator to register a tool in the global tool registry.
+    Decorator to register a tool function in the global tool registry.
+    The LangChain tool (schema from signature + docstring) is built lazily
+    by get_tools().
     """
 
     def wrapper(func):
-        lc_tool = tool(func)
-        lc_tool.name = name
-        TOOLS_REGISTRY[name] = lc_tool
-        return lc_tool
+        TOOLS_REGISTRY[name] = func
+        return func
+    return wrapper
+
+
+def _is_upstream_failure(error: BaseException) -> bool:
+    """
+    Whether a tool exception means the upstream service is failing:
+    transport errors, timeouts, 5xx and 429 responses. Bad arguments,
+    unknown cities/currencies and errors served from the negative cache
+    (CachedError) say nothing new about the upstream.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(error, (httpx.TransportError, TimeoutError))
+
+
+def _guarded(name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wraps a tool with its circuit breaker and a timeout: TOOL_TIMEOUT_SECONDS,
+    cut short by the propagated deadline (see deadline_scope) if one is set.
+    Open breakers, timeouts and exceptions come back as {"error": ...};
+    only upstream failures count towards opening the breaker, and timeouts
+    only when the tool had its full TOOL_TIMEOUT_SECONDS (not when the run
+    deadline cut it short).
+    """
+    breaker = CircuitBreaker(name)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            await breaker.before_call()
+        except CircuitOpenError as e:
+            return {"error": str(e)}
+
+        tool_timeout = get_settings().tool_timeout_seconds
+        left = time_left()
+        timeout = tool_timeout if left is None else min(tool_timeout, left)
+        if timeout <= 0:
+            await breaker.release()
+            return {"error": f"No time left to run '{name}'"}
+
+        try:
+            # Everything the tool does (HTTP retries included) sees the deadline
+            with deadline_scope(time.time() + timeout):
+                result = await asyncio.wait_for(func(*args, **kwargs), timeout)
+        except DeadlineExceeded as e:
+            result = {"error": str(e)}
+            failed = False  # the deadline ran out before the upstream was asked
+        except asyncio.TimeoutError:
+            result = {"error": f"Tool '{name}' timed out after {timeout:.1f}s"}
+            failed = timeout >= tool_timeout  # not when cut short by the run deadline
+        except Exception as e:
+            # Some exceptions (e.g. httpx.ConnectTimeout()) have no message
+            result = {"error": str(e) or type(e).__name__}
+            if isinstance(e, httpx.TimeoutException):
+                failed = timeout >= tool_timeout
+            else:
+                failed = _is_upstream_failure(e)
+        else:
+            await breaker.record_success()
+            return result
+
+        if failed:
+            await breaker.record_failure(result["error"])
+        else:
+            await breaker.release()
+        return result
+
     return wrapper
+
+
+@lru_cache
+def get_tools() -> Dict[str, BaseTool]:
+    """
+    Imports the tool modules and builds every registered tool, once.
+    """
+    for module in TOOL_MODULES:
+        importlib.import_module(f"app.tools.{module}")
+
+    tools = {}
+    for name, func in TOOLS_REGISTRY.items():
+        lc_tool = tool(_guarded(name, func))
+        lc_tool.name = name
+        tools[name] = lc_tool
+    return tools
+
+
+def get_tool(name: str) -> Optional[BaseTool]:
+    return get_tools().get(name)
+
+
+@lru_cache
+def describe_tools(indent: str = "") -> str:
+    """
+    Numbered "name(signature)" + description of every registered tool,
+    for the agents' system prompts (so they never drift from the registry).
+    """
+    lines = []
+    for i, (name, lc_tool) in enumerate(get_tools().items(), 1):
+        # List[app.tools.currency.Conversion] -> List[Conversion]
+        signature = re.sub(r"\b(?:\w+\.)+(\w+)", r"\1", str(inspect.signature(TOOLS_REGISTRY[name])))
+        lines.append(f"{indent}{i}. {name}{signature}")
+        lines += [f"{indent}- {line.strip()}" for line in lc_tool.description.splitlines() if line.strip()]
+    return "\n".join(lines)
@@ -1,17 +1,114 @@
 # app/tools/translate.py
-import requests
+import asyncio
+import re
+from typing import Dict, List, Tuple
+
+import xxhash
+
+from app.core.http_client import aget_json
 from app.tools.registry import register_tool
+from app.utils.cache import acache_get_many, acache_set_many
+
+MYMEMORY_URL = "https://api.mymemory.translated.net/get"
+MAX_QUERY_BYTES = 450  # MyMemory rejects q over 500 bytes
+SEGMENT_JOINER = "\n"
+TRANSLATION_TTL = 30 * 24 * 3600  # translations don't go stale
+
+# Sentence ends / line breaks, kept so the text can be reassembled
+_SPLIT = re.compile(r"(\s*\n\s*|(?<=[.!?])\s+)")
+
+
+def _split(text: str) -> Tuple[List[str], List[str]]:
+    """
+    "Hi. Bye.\nOk" -> (["Hi.", "Bye.", "Ok"], [" ", "\n"]).
+    """
+    parts = _SPLIT.split(text.strip())
+    return parts[0::2], parts[1::2]
+
+
+def _join(segments: List[str], separators: List[str]) -> str:
+    out = [segments[0]]
+    for sep, seg in zip(separators, segments[1:]):
+        out += [sep, seg]
+    return "".join(out)
+
+
+def _key(source: str, target: str, segment: str) -> str:
+    return f"translate:{source}:{target}:{xxhash.xxh3_64_hexdigest(segment)}"
+
+
+async def _request(q: str, source: str, target: str) -> str:
+    data = await aget_json(MYMEMORY_URL, params={"q": q, "langpair": f"{source}|{target}"})
+    if int(data.get("responseStatus") or 200) != 200:
+        raise ValueError(data.get("responseDetails") or "translation failed")
+    return data["responseData"]["translatedText"]
+
+
+def _chunks(segments: List[str]) -> List[List[str]]:
+    # Pack segments into as few upstream requests as the size limit allows
+    chunks, current, size = [], [], 0
+    for seg in segments:
+        seg_size = len(seg.encode()) + len(SEGMENT_JOINER)
+        if current and size + seg_size > MAX_QUERY_BYTES:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(seg)
+        size += seg_size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def _translate_chunk(chunk: List[str], source: str, target: str) -> List[str]:
+    if len(chunk) > 1:
+        translated = (await _request(SEGMENT_JOINER.join(chunk), source, target)).split(SEGMENT_JOINER)
+        if len(translated) == len(chunk):
+            return [t.strip() for t in translated]
+
+    # Single segment, or the joiner didn't survive translation
+    return list(await asyncio.gather(*(_request(seg, source, target) for seg in chunk)))
+
+
+async def translate_segments(segments: List[str], source: str, target: str) -> Dict[str, str]:
+    """
+    Translations for the distinct segments: cached ones from one Redis
+    round trip, the rest in as few batched upstream requests as possible.
+    """
+    unique = list(dict.fromkeys(s for s in segments if s))
+    cached = await acache_get_many([_key(source, target, s) for s in unique])
+
+    result = {s: t for s, t in zip(unique, cached) if t is not None}
+    misses = [s for s in unique if s not in result]
+
+    translated = await asyncio.gather(*(_translate_chunk(c, source, target) for c in _chunks(misses)))
+    fresh = dict(zip(misses, (t for chunk in translated for t in chunk)))
+
+    await acache_set_many({_key(source, target, s): t for s, t in fresh.items()}, ttl=TRANSLATION_TTL)
+    return {**result, **fresh}
+
+
+async def translate_texts(texts: List[str], target_lang: str, source_lang: str = "en") -> List[str]:
+    split = [_split(text) for text in texts]
+    translations = await translate_segments(
+        [seg for segments, _ in split for seg in segments], source_lang, target_lang
+    )
+    return [
+        _join([translations.get(seg, seg) for seg in segments], separators)
+        for segments, separators in split
+    ]
+
 
 @register_tool("translate_language")
-def translate_language(text: str, target_lang: str):
-
-    """Translate text from any language to the target language."""
-    
-    url = "https://api.mymemory.translated.net/get"
-    params = {"q": text, "langpair": f"en|{target_lang}"}
-
-    try:
-        data = requests.get(url, params=params).json()
-        return {"translated": data["responseData"]["translatedText"]}
-    except Exception as e:
-        return {"error": str(e)}
+async def translate_language(text: str, target_lang: str, source_lang: str = "en"):
+
+    """Translate text from the source language (default English) to the target language."""
+
+    return {"translated": (await translate_texts([text], target_lang, source_lang))[0]}
+
+
+@register_tool("translate_batch")
+async def translate_batch(texts: List[str], target_lang: str, source_lang: str = "en"):
+
+    """Translate several texts in one call; returns {"translations": [...]} in input order."""
+
+    return {"translations": await translate_texts(texts, target_lang, source_lang)}
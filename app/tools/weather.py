@@ -1,35 +1,109 @@
 # app/tools/weather.py
-import requests
+import asyncio
+import re
+import unicodedata
+from typing import List, Optional
+from urllib.parse import quote
+
+from app.core.config import get_settings
+from app.core.http_client import aget_json
+from app.core.redis_client import get_async_redis_client
 from app.tools.registry import register_tool
-from app.utils.cache import cache_get, cache_set
+from app.utils.cache import LocalTTLCache, cached
+
+WEATHER_TTL = 900  # 15 minutes fresh, 15 more stale
+WEATHER_STALE_TTL = 900
+
+# Learned "user spelling" -> canonical "area, country" (from wttr.in nearest_area),
+# one key per spelling. An alias lives as long as a weather entry, and
+# every lookup through it extends it, so only spellings in use are kept.
+ALIAS_KEY = "weather:alias:{}"
+ALIAS_TTL = WEATHER_TTL + WEATHER_STALE_TTL
+_aliases = LocalTTLCache()
+
+
+def normalize_city(city: str) -> str:
+    """
+    Spelling-insensitive location key: "  São Paulo ,BR" -> "sao paulo, br".
+    """
+    text = unicodedata.normalize("NFKD", city).encode("ascii", "ignore").decode()
+    text = re.sub(r"[^\w\s,'-]", " ", text.lower())
+    parts = [re.sub(r"\s+", " ", p).strip() for p in text.split(",")]
+    return ", ".join(p for p in parts if p)
+
+
+async def _canonical(key: str) -> Optional[str]:
+    entry = _aliases.get(key)
+    if entry is None:
+        entry = {"canonical": await get_async_redis_client().getex(ALIAS_KEY.format(key), ex=ALIAS_TTL)}
+        _aliases.set(key, entry, get_settings().cache_local_ttl_seconds)
+    return entry["canonical"]
+
+
+async def _learn_alias(key: str, canonical: str):
+    await get_async_redis_client().set(ALIAS_KEY.format(key), canonical, ex=ALIAS_TTL)
+    _aliases.set(key, {"canonical": canonical}, get_settings().cache_local_ttl_seconds)
+
+
+@cached("weather", ttl=WEATHER_TTL, stale_ttl=WEATHER_STALE_TTL)
+async def _fetch_weather(location: str):
+    url = f"https://wttr.in/{quote(location)}"
+    data = await aget_json(url, params={"format": "j1"})
+
+    current = data["current_condition"][0]
+    area = (data.get("nearest_area") or [{}])[0]
+    name = ", ".join(
+        v[0]["value"] for v in (area.get("areaName"), area.get("country")) if v
+    )
+
+    return {
+        "location": name or location,
+        "temp_C": current["temp_C"],
+        "weather_desc": current["weatherDesc"][0]["value"],
+        "humidity": current["humidity"],
+    }
+
+
+async def city_weather(city: str) -> dict:
+    """
+    Weather for `city`, cached under its canonical location so different
+    spellings of the same place share one entry after the first lookup.
+    """
+    key = normalize_city(city)
+    canonical = await _canonical(key)
+    if canonical:
+        return await _fetch_weather(canonical)
+
+    result = await _fetch_weather(key)
+
+    canonical = normalize_city(result["location"])
+    if canonical and canonical != key:
+        await _learn_alias(key, canonical)
+        await _fetch_weather.prime(result, canonical)
+    return result
+
 
 @register_tool("get_weather")
-def get_weather(city: str):
+async def get_weather(city: str):
     """
     Get weather info using Open-Meteo API (free, no key).
     """
 
-    key = f"weather:{city.lower()}"
-    cached = cache_get(key)
-    if cached:
-        print("\n\nCached hit\n\n")
-        return cached
+    return await city_weather(city)
 
-    try:
-        url = f"https://wttr.in/{city}?format=j1"
-        data = requests.get(url).json()
 
-        current = data["current_condition"][0]
-
-        result = {
-            "temp_C": current["temp_C"],
-            "weather_desc": current["weatherDesc"][0]["value"],
-            "humidity": current["humidity"],
-        }
+@register_tool("get_weather_batch")
+async def get_weather_batch(cities: List[str]):
+    """
+    Current weather for several cities in one call (fetched concurrently).
+    Returns {"results": [{city, location, temp_C, weather_desc, humidity} or {city, error}]}.
+    """
 
-        cache_set(key, result, ttl=900)  # 15 minutes
+    async def one(city: str):
+        try:
+            return {"city": city, **(await city_weather(city))}
+        except Exception as e:
+            return {"city": city, "error": str(e)}
 
-        return result
-    
-    except Exception as e:
-        return {"error": str(e)}
+    # Same place spelled twice resolves to one fetch (cache single-flight)
+    return {"results": list(await asyncio.gather(*(one(city) for city in cities)))}
@@ -1,42 +1,35 @@
 # app/tools/web_search.py
-from tavily import TavilyClient
 from app.core.config import get_settings
+from app.core.http_client import apost_json
 from app.tools.registry import register_tool
-from app.utils.cache import cache_get, cache_set
-
-settings = get_settings()
-tavily = TavilyClient(api_key=settings.tavily_api_key)
+from app.utils.cache import cached
+
+# Tavily REST API, called through the shared pooled client
+# (the SDK opens a new connection per request)
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+@cached("search", ttl=3600, stale_ttl=1800)
+async def _search(query: str, max_results: int):
+    response = await apost_json(
+        TAVILY_SEARCH_URL,
+        json={"query": query, "max_results": max_results},
+        headers={"Authorization": f"Bearer {get_settings().tavily_api_key}"},
+    )
+
+    # Tavily returns: {"results": [ ... ]}
+    return [
+        {
+            "title": item.get("title"),
+            "url": item.get("url"),
+            "snippet": item.get("content"),
+        }
+        for item in response.get("results", [])
+    ]
 
 @register_tool("web_search")
-def web_search(query: str, max_results: int = 5):
+async def web_search(query: str, max_results: int = 5):
     """
-    Returns list of {title, url, snippet}.
+    Search the web; returns a list of {title, url, snippet}.
     """
 
-    key = f"search:{query}:{max_results}"
-    cached = cache_get(key)
-    if cached:
-        return cached
-
-    try:
-        response = tavily.search(
-            query=query,
-            max_results=max_results,
-        )
-
-        # Tavily returns: {"results": [ ... ]}
-        clean_results = []
-
-        for item in response.get("results", []):
-            clean_results.append({
-                "title": item.get("title"),
-                "url": item.get("url"),
-                "snippet": item.get("content"),
-            })
-
-        cache_set(key, clean_results, ttl=3600)
-
-        return clean_results
-    
-    except Exception as e:
-        return [{"title": "Search Error", "href": None, "snippet": str(e)}]
+    return await _search(query, max_results)
@@ -1,24 +1,312 @@
 # app/utils/cache.py
-import json
-from typing import Any
-from app.core.redis_client import redis_client
+import asyncio
+import functools
+import inspect
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from app.core.config import get_settings
+from app.core.redis_client import get_async_redis_client, get_async_redis_raw_client
+from app.utils import codec
+from app.utils.singleflight import SingleFlight, redis_single_flight
 
+# Coalesces concurrent fills / refreshes of the same key within this process
+_flight = SingleFlight()
 
-def cache_get(key: str) -> Any:
+# Background refresh tasks (strong refs so they are not garbage collected)
+_refresh_tasks: set = set()
+
+
+def _encode(value: Any) -> bytes:
+    settings = get_settings()
+    return codec.encode(
+        value,
+        codec=settings.cache_codec,
+        compress_min_bytes=settings.cache_compress_min_bytes,
+        level=settings.cache_zstd_level,
+    )
+
+
+def _decode(raw: Any) -> Any:
+    if raw is None:
+        return None
+    try:
+        return codec.decode(raw)
+    except:
+        return raw.decode("utf-8", "replace")
+
+
+async def acache_get(key: str) -> Any:
     """
-    Returns cached value if present, else None.
+    Returns the cached value if present, else None.
     """
-    raw = redis_client.get(key)
+    return _decode(await get_async_redis_raw_client().get(key))
+
+
+async def acache_set(key: str, value: Any, ttl: int = 3600):
+    """
+    Caches a value with TTL (default: 1 hour).
+    """
+    await get_async_redis_raw_client().set(key, _encode(value), ex=ttl)
+
+
+async def acache_get_many(keys: List[str]) -> List[Any]:
+    """
+    Batched acache_get (one round trip); missing keys come back as None.
+    """
+    if not keys:
+        return []
+    return [_decode(raw) for raw in await get_async_redis_raw_client().mget(keys)]
+
+
+async def acache_set_many(values: Dict[str, Any], ttl: int = 3600):
+    """
+    Batched acache_set (one pipelined round trip).
+    """
+    if not values:
+        return
+    pipe = get_async_redis_raw_client().pipeline(transaction=False)
+    for key, value in values.items():
+        pipe.set(key, _encode(value), ex=ttl)
+    await pipe.execute()
+
+
+# ---------- Two-tier cache (process LRU + Redis) ----------
+#
+# Entries are envelopes so that falsy values are real hits and errors can
+# be cached too:
+#     {"v": value, "s": fresh_until}          value
+#     {"e": "message", "s": fresh_until}      negative entry (upstream error)
+# Between "s" and the key's hard expiry a value is served stale while it
+# is refreshed in the background.
+
+
+class CachedError(Exception):
+    """
+    Upstream error served from the negative cache.
+    """
+
+
+class LocalTTLCache:
+    """
+    Bounded per-process LRU whose entries also expire after a TTL.
+    The size limit defaults to CACHE_LOCAL_MAXSIZE, read on first write.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self._maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+
+    @property
+    def maxsize(self) -> int:
+        if self._maxsize is None:
+            self._maxsize = get_settings().cache_local_maxsize
+        return self._maxsize
+
+    def get(self, key: str) -> Optional[dict]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+
+        expires_at, entry = item
+        if time.time() >= expires_at:
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: dict, ttl: float):
+        self._data[key] = (time.time() + ttl, entry)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+
+local_cache = LocalTTLCache()
+
+
+def _remember_locally(key: str, entry: dict, hard_ttl: float):
+    # Short local TTL bounds how long workers can disagree
+    local_cache.set(key, entry, min(hard_ttl, get_settings().cache_local_ttl_seconds))
+
+
+async def _read_entry(key: str) -> Optional[dict]:
+    entry = local_cache.get(key)
+    if entry is not None:
+        return entry
+
+    raw, ttl = await get_async_redis_raw_client().pipeline(transaction=False).get(key).ttl(key).execute()
     if raw is None:
         return None
+
+    entry = _decode(raw)
+    if not isinstance(entry, dict) or "s" not in entry:
+        return None  # pre-envelope entry, refill it
+    if ttl and ttl > 0:
+        _remember_locally(key, entry, ttl)
+    return entry
+
+
+async def _write_entry(key: str, entry: dict, hard_ttl: float):
+    await get_async_redis_raw_client().set(key, _encode(entry), ex=max(1, int(hard_ttl)))
+    _remember_locally(key, entry, hard_ttl)
+
+
+def _unwrap(entry: dict) -> Any:
+    if "e" in entry:
+        raise CachedError(entry["e"])
+    return entry["v"]
+
+
+async def _compute(key: str, fetch, ttl: int, stale_ttl: int, negative_ttl: int) -> dict:
+    now = time.time()
     try:
-        return json.loads(raw)
-    except:
-        return raw
+        value = await fetch()
+    except Exception as e:
+        if negative_ttl > 0:
+            await _write_entry(key, {"e": str(e), "s": now + negative_ttl}, negative_ttl)
+        raise
+
+    entry = {"v": value, "s": now + ttl}
+    await _write_entry(key, entry, ttl + stale_ttl)
+    return entry
+
+
+async def _fill(key: str, fetch, ttl: int, stale_ttl: int, negative_ttl: int) -> Any:
+    entry = await _read_entry(key)
+    if entry is None:
+        entry = await redis_single_flight(
+            key,
+            lambda: _read_entry(key),
+            lambda: _compute(key, fetch, ttl, stale_ttl, negative_ttl),
+        )
+    return _unwrap(entry)
+
+
+def _refresh_in_background(key: str, fetch, ttl: int, stale_ttl: int, negative_ttl: int):
+    async def refresh():
+        # One refresher per key across workers; losers keep serving stale
+        lock_key = f"lock:refresh:{key}"
+        if not await get_async_redis_client().set(lock_key, 1, nx=True, ex=max(1, int(ttl))):
+            return
+        try:
+            await _compute(key, fetch, ttl, stale_ttl, negative_ttl=0)
+        except Exception as e:
+            print("Cache refresh failed:", key, e)
+        finally:
+            await get_async_redis_client().delete(lock_key)
+
+    task = asyncio.create_task(_flight.do(f"refresh:{key}", refresh))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+async def cached_call(
+    key: str,
+    fetch: Callable[[], Awaitable[Any]],
+    ttl: int = 3600,
+    stale_ttl: int = 0,
+    negative_ttl: int = 30,
+) -> Any:
+    """
+    Two-tier read-through cache for an async fetch().
+
+    - fresh for `ttl` seconds, then served stale for up to `stale_ttl`
+      more while one background refresh runs;
+    - misses are filled once per key (single-flight in-process and
+      across workers);
+    - fetch() errors are cached for `negative_ttl` seconds and re-raised
+      as CachedError so a failing upstream is not hammered.
+    """
+
+    entry = await _read_entry(key)
 
+    if entry is None:
+        return await _flight.do(key, lambda: _fill(key, fetch, ttl, stale_ttl, negative_ttl))
 
-def cache_set(key: str, value: Any, ttl: int = 3600):
+    if time.time() >= entry["s"] and "e" not in entry:
+        _refresh_in_background(key, fetch, ttl, stale_ttl, negative_ttl)
+
+    return _unwrap(entry)
+
+
+async def warm_call(
+    key: str,
+    fetch: Callable[[], Awaitable[Any]],
+    ttl: int = 3600,
+    stale_ttl: int = 0,
+    min_interval: float = 60.0,
+) -> bool:
+    """
+    Proactively recompute `key` (periodic warming). At most one worker
+    refreshes a key per `min_interval` seconds; returns whether this one did.
+    """
+    if not await get_async_redis_client().set(f"lock:warm:{key}", 1, nx=True, ex=max(1, int(min_interval))):
+        return False
+
+    await _compute(key, fetch, ttl, stale_ttl, negative_ttl=0)
+    return True
+
+
+async def prime_call(key: str, value: Any, ttl: int = 3600, stale_ttl: int = 0):
+    """
+    Store a value obtained elsewhere (e.g. the same data under another key).
+    """
+    await _write_entry(key, {"v": value, "s": time.time() + ttl}, ttl + stale_ttl)
+
+
+def cached(
+    prefix: str,
+    ttl: int = 3600,
+    stale_ttl: int = 0,
+    negative_ttl: int = 30,
+    key: Callable[..., str] | None = None,
+):
     """
-    Cache a value with TTL (default: 1 hour).
+    Decorator form of cached_call for async functions. The cache key is
+    "{prefix}:{key(**arguments)}", by default all arguments (defaults
+    applied) joined with ":".
+
+        @cached("news", ttl=600, stale_ttl=300)
+        async def fetch_news(query: str, max_results: int = 5): ...
+
+    The wrapper also gets `warm(*args, min_interval=..., **kwargs)` and
+    `prime(value, *args, **kwargs)`, the warm_call / prime_call forms for
+    the same arguments.
     """
-    redis_client.set(key, json.dumps(value), ex=ttl)
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        def bind(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+
+            suffix = key(**bound.arguments) if key else ":".join(str(v) for v in bound.arguments.values())
+            return f"{prefix}:{suffix}", lambda: fn(*bound.args, **bound.kwargs)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            cache_key, fetch = bind(args, kwargs)
+            return await cached_call(cache_key, fetch, ttl=ttl, stale_ttl=stale_ttl, negative_ttl=negative_ttl)
+
+        async def warm(*args, min_interval: float = 60.0, **kwargs):
+            cache_key, fetch = bind(args, kwargs)
+            return await warm_call(cache_key, fetch, ttl=ttl, stale_ttl=stale_ttl, min_interval=min_interval)
+
+        async def prime(value: Any, *args, **kwargs):
+            cache_key, _ = bind(args, kwargs)
+            await prime_call(cache_key, value, ttl=ttl, stale_ttl=stale_ttl)
+
+        wrapper.warm = warm
+        wrapper.prime = prime
+        return wrapper
+
+    return decorator
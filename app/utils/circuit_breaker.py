@@ -0,0 +1,139 @@
+# app/utils/circuit_breaker.py
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import get_settings
+from app.core.redis_client import get_async_redis_client
+
+# Breaker state is shared by all workers:
+#     breaker:{name}         hash  state, open_until, last_error, opened
+#     breaker:{name}:fails   failure counter, expires after the window
+#     breaker:{name}:probe   held by the single half-open trial call
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """
+    Call rejected without running because the breaker is open.
+    """
+
+    def __init__(self, name: str, retry_in: float):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(f"{name} is temporarily unavailable; retry in {retry_in:.0f}s")
+
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker keyed by `name`.
+
+    Opens after `failure_threshold` failures within `window_seconds`,
+    rejects calls for `cooldown_seconds`, then lets one trial call through:
+    success closes it, failure re-opens it. Redis errors never block calls.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        window_seconds: Optional[float] = None,
+        cooldown_seconds: Optional[float] = None,
+    ):
+        settings = get_settings()
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.breaker_failure_threshold
+        self.window_seconds = window_seconds or settings.breaker_window_seconds
+        self.cooldown_seconds = cooldown_seconds or settings.breaker_cooldown_seconds
+
+        self.key = f"breaker:{name}"
+        self.fails_key = f"{self.key}:fails"
+        self.probe_key = f"{self.key}:probe"
+
+    async def before_call(self):
+        """
+        Raises CircuitOpenError when the call must not run.
+        """
+        redis = get_async_redis_client()
+        try:
+            state, open_until = await redis.hmget(self.key, "state", "open_until")
+            if state != OPEN:
+                return
+
+            retry_in = float(open_until or 0) - time.time()
+            if retry_in > 0:
+                raise CircuitOpenError(self.name, retry_in)
+
+            # Cooldown over: exactly one caller probes the upstream
+            if not await redis.set(self.probe_key, 1, nx=True, ex=max(1, int(self.cooldown_seconds))):
+                raise CircuitOpenError(self.name, self.cooldown_seconds)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            print("Circuit breaker error:", e)
+
+    async def record_success(self):
+        redis = get_async_redis_client()
+        try:
+            state, fails = await redis.pipeline().hget(self.key, "state").exists(self.fails_key).execute()
+            if (state or CLOSED) != CLOSED or fails:
+                await (
+                    redis.pipeline()
+                    .hset(self.key, mapping={"state": CLOSED, "open_until": 0})
+                    .delete(self.fails_key, self.probe_key)
+                    .execute()
+                )
+        except Exception as e:
+            print("Circuit breaker error:", e)
+
+    async def release(self):
+        """
+        The call told nothing about the upstream (bad input, cached error):
+        frees the half-open trial slot without changing the state.
+        """
+        try:
+            await get_async_redis_client().delete(self.probe_key)
+        except Exception as e:
+            print("Circuit breaker error:", e)
+
+    async def record_failure(self, error: Any):
+        redis = get_async_redis_client()
+        try:
+            fails, _ = await (
+                redis.pipeline()
+                .incr(self.fails_key)
+                .expire(self.fails_key, max(1, int(self.window_seconds)), nx=True)
+                .execute()
+            )
+
+            probing = await redis.delete(self.probe_key)
+            if probing or fails >= self.failure_threshold:
+                await (
+                    redis.pipeline()
+                    .hset(self.key, mapping={
+                        "state": OPEN,
+                        "open_until": time.time() + self.cooldown_seconds,
+                        "last_error": str(error)[:300],
+                    })
+                    .hincrby(self.key, "opened", 1)
+                    .delete(self.fails_key)
+                    .execute()
+                )
+        except Exception as e:
+            print("Circuit breaker error:", e)
+
+    async def status(self) -> Dict[str, Any]:
+        redis = get_async_redis_client()
+        data, fails = await redis.pipeline().hgetall(self.key).get(self.fails_key).execute()
+
+        state = data.get("state", CLOSED)
+        retry_in = max(0.0, float(data.get("open_until") or 0) - time.time())
+        if state == OPEN and retry_in == 0:
+            state = HALF_OPEN
+
+        return {
+            "state": state,
+            "recent_failures": int(fails or 0),
+            "retry_in_seconds": round(retry_in, 1),
+            "times_opened": int(data.get("opened", 0)),
+            "last_error": data.get("last_error"),
+        }
@@ -0,0 +1,135 @@
+# app/utils/codec.py
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict
+
+import orjson
+import ormsgpack
+import zstandard
+
+# Wire format of cached values:
+#
+#     [header byte][payload]
+#
+# header = codec id (low 7 bits) | ZSTD_FLAG when the payload is compressed.
+# Anything without a known header is legacy json.dumps text; ids stay
+# below 0x20 so they never collide with the first byte of JSON text.
+
+ZSTD_FLAG = 0x80
+COMPRESS_MIN_BYTES = 1024
+ZSTD_LEVEL = 3
+
+
+class Codec(ABC):
+    """
+    Serializer for cache values. `id` goes into the header byte and must
+    never be reused for a different format.
+    """
+    id: int
+    name: str
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        ...
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        ...
+
+
+class MsgpackCodec(Codec):
+    id = 1
+    name = "msgpack"
+
+    def dumps(self, value: Any) -> bytes:
+        return ormsgpack.packb(value, option=ormsgpack.OPT_NON_STR_KEYS)
+
+    def loads(self, data: bytes) -> Any:
+        return ormsgpack.unpackb(data)
+
+
+class OrjsonCodec(Codec):
+    id = 2
+    name = "orjson"
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+CODECS: Dict[str, Codec] = {}
+_BY_ID: Dict[int, Codec] = {}
+
+
+def register_codec(codec: Codec):
+    """
+    Make a codec available for encoding (by name) and decoding (by id).
+    """
+    if not 0 < codec.id < 0x20:
+        raise ValueError(f"Invalid codec id {codec.id}")
+    CODECS[codec.name] = codec
+    _BY_ID[codec.id] = codec
+
+
+register_codec(MsgpackCodec())
+register_codec(OrjsonCodec())
+
+
+# zstd contexts are not safe to share between threads (sync callers run
+# in the threadpool), so keep one pair per thread
+_zstd = threading.local()
+
+
+def _compressor(level: int) -> zstandard.ZstdCompressor:
+    compressors = getattr(_zstd, "compressors", None)
+    if compressors is None:
+        compressors = _zstd.compressors = {}
+    if level not in compressors:
+        compressors[level] = zstandard.ZstdCompressor(level=level)
+    return compressors[level]
+
+
+def _decompressor() -> zstandard.ZstdDecompressor:
+    if not hasattr(_zstd, "decompressor"):
+        _zstd.decompressor = zstandard.ZstdDecompressor()
+    return _zstd.decompressor
+
+
+def encode(
+    value: Any,
+    codec: str = "msgpack",
+    compress_min_bytes: int = COMPRESS_MIN_BYTES,
+    level: int = ZSTD_LEVEL,
+) -> bytes:
+    """
+    Serialize `value` with the named codec, zstd-compressing payloads of
+    at least `compress_min_bytes` (0 disables compression).
+    """
+    c = CODECS[codec]
+    payload = c.dumps(value)
+    header = c.id
+
+    if compress_min_bytes and len(payload) >= compress_min_bytes:
+        compressed = _compressor(level).compress(payload)
+        if len(compressed) < len(payload):
+            payload = compressed
+            header |= ZSTD_FLAG
+
+    return bytes((header,)) + payload
+
+
+def decode(data: bytes) -> Any:
+    """
+    Inverse of encode(); also reads legacy JSON text entries.
+    """
+    codec = _BY_ID.get(data[0] & ~ZSTD_FLAG) if data else None
+    if codec is None:
+        return json.loads(data)
+
+    payload = memoryview(data)[1:]
+    if data[0] & ZSTD_FLAG:
+        payload = _decompressor().decompress(payload)
+    return codec.loads(bytes(payload))
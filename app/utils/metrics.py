@@ -0,0 +1,24 @@
+# app/utils/metrics.py
+from typing import Dict
+from app.core.redis_client import get_async_redis_client
+
+# Counters are shared by all workers through a single Redis hash
+METRICS_KEY = "metrics:counters"
+
+
+async def incr(name: str, amount: int = 1):
+    """
+    Increment a named counter. Metrics must never break a request.
+    """
+    try:
+        await get_async_redis_client().hincrby(METRICS_KEY, name, amount)
+    except Exception as e:
+        print("Metrics error:", e)
+
+
+async def snapshot() -> Dict[str, int]:
+    """
+    Current value of every counter.
+    """
+    raw = await get_async_redis_client().hgetall(METRICS_KEY)
+    return {name: int(value) for name, value in sorted(raw.items())}
@@ -0,0 +1,106 @@
+# app/utils/singleflight.py
+import asyncio
+import functools
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.redis_client import get_async_redis_client
+
+# Delete the lock only if we still own it
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    In-process call coalescing: while a call for `key` is running, other
+    callers with the same key await the same task instead of starting
+    their own call. The call runs in its own task, so a cancelled caller
+    (the one that started it included) never fails the others; it is
+    cancelled only once every caller has gone.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, _Call] = {}
+
+    def _done(self, key: str, call: _Call, task: asyncio.Future):
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when nobody is waiting
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._inflight.get(key)
+        if call is None:
+            call = self._inflight[key] = _Call(asyncio.ensure_future(fn()))
+            call.task.add_done_callback(functools.partial(self._done, key, call))
+
+        call.waiters += 1
+        try:
+            # shield: a cancelled caller must not cancel the shared call
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()  # last caller gone, nobody needs the result
+            raise
+        finally:
+            call.waiters -= 1
+
+
+async def redis_single_flight(
+    key: str,
+    read: Callable[[], Awaitable[Optional[Any]]],
+    compute: Callable[[], Awaitable[Any]],
+    lock_seconds: float = 30.0,
+    poll_seconds: float = 0.05,
+) -> Any:
+    """
+    Cross-process coalescing with a Redis lock.
+
+    The first process to take `lock:{key}` runs `compute` (which is
+    expected to publish its result where `read` finds it). Others wait,
+    polling `read` with backoff, until the result appears. If the lock
+    holder dies or the lock expires without a result, the waiter computes
+    the value itself rather than failing.
+    """
+
+    lock_key = f"lock:{key}"
+    token = uuid.uuid4().hex
+
+    if await get_async_redis_client().set(lock_key, token, nx=True, px=int(lock_seconds * 1000)):
+        try:
+            return await compute()
+        finally:
+            await get_async_redis_client().eval(_RELEASE_LOCK, 1, lock_key, token)
+
+    deadline = time.monotonic() + lock_seconds
+    delay = poll_seconds
+    while time.monotonic() < deadline:
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+        value = await read()
+        if value is not None:
+            return value
+
+        if not await get_async_redis_client().exists(lock_key):
+            # Holder finished without publishing (e.g. upstream error)
+            value = await read()
+            if value is not None:
+                return value
+            break
+
+    return await compute()
@@ -0,0 +1,52 @@
+# app/utils/tokens.py
+from functools import lru_cache
+
+import tiktoken
+
+# gpt-oss models use the o200k tokenizer family
+ENCODING_NAME = "o200k_base"
+
+# Chat formatting overhead per message (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache
+def _get_encoding():
+    try:
+        return tiktoken.get_encoding(ENCODING_NAME)
+    except Exception:
+        # BPE file could not be loaded (e.g. no network on first use)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Number of tokens in text. Falls back to ~4 chars/token
+    when the tiktoken encoding is unavailable.
+    """
+    if not text:
+        return 0
+
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, ellipsis: str = "…") -> str:
+    """
+    Text cut to at most max_tokens tokens (plus `ellipsis` when cut).
+    """
+    if not text or max_tokens <= 0:
+        return "" if max_tokens <= 0 else text
+
+    encoding = _get_encoding()
+    if encoding is None:
+        max_chars = max_tokens * 4
+        return text if len(text) <= max_chars else text[:max_chars].rstrip() + ellipsis
+
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens]).rstrip() + ellipsis
@@ -0,0 +1,36 @@
+# app/worker.py
+"""
+rq worker for agent turns queued in job mode (AGENT_JOB_MODE=true, or a
+request sent with "Prefer: respond-async"):
+
+    python -m app.worker             # run jobs in this process
+    python -m app.worker --fork      # fork a work horse per job (isolation)
+    python -m app.worker --burst     # exit once the queue is empty
+
+Scale agent capacity by running more workers, independently of the web
+processes. Workers need the same environment as the API (REDIS_URL,
+DATABASE_URL, GROQ_API_KEY, tool keys).
+"""
+import argparse
+
+from rq import SimpleWorker, Worker
+
+from app.core.redis_client import get_redis_raw_client
+from app.services.agent_jobs import get_agent_queue
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fork", action="store_true",
+                        help="fork per job; isolates crashes but rebuilds clients, LLM and graph every job")
+    parser.add_argument("--burst", action="store_true", help="exit when the queue is empty")
+    args = parser.parse_args()
+
+    # In-process (default) keeps the Redis/HTTP/DB pools warm across jobs
+    worker_class = Worker if args.fork else SimpleWorker
+    worker = worker_class([get_agent_queue()], connection=get_redis_raw_client())
+    worker.work(burst=args.burst)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/cache_codec.py
+"""
+Compare the cache encodings on representative tool payloads: the legacy
+json.dumps text path against the codecs in app/utils/codec.py.
+
+    python -m benchmarks.cache_codec [--results 10] [--number 2000]
+    REDIS_URL=redis://localhost:6379/15 python -m benchmarks.cache_codec --redis
+
+Reports payload size, encode/decode time per call and, with --redis,
+the server-side MEMORY USAGE of each stored key.
+"""
+import argparse
+import json
+import os
+import random
+import string
+import timeit
+
+from app.utils import codec
+
+random.seed(7)
+
+
+def _words(n: int) -> str:
+    return " ".join(
+        "".join(random.choices(string.ascii_lowercase, k=random.randint(3, 9)))
+        for _ in range(n)
+    )
+
+
+def web_search_payload(results: int) -> list:
+    return [
+        {
+            "title": _words(8).title(),
+            "url": f"https://example.com/{_words(3).replace(' ', '-')}",
+            "snippet": _words(120),
+        }
+        for _ in range(results)
+    ]
+
+
+def news_payload(results: int) -> list:
+    return [
+        {
+            "title": _words(10).title(),
+            "description": _words(40),
+            "url": f"https://news.example.com/{i}/{_words(4).replace(' ', '-')}",
+        }
+        for i in range(results)
+    ]
+
+
+def weather_payload() -> dict:
+    return {"temp_C": "21", "weather_desc": "Partly cloudy", "humidity": "64"}
+
+
+def _variants():
+    yield "json (legacy)", lambda v: json.dumps(v).encode(), lambda b: json.loads(b)
+    for name in codec.CODECS:
+        yield name, (lambda v, n=name: codec.encode(v, codec=n, compress_min_bytes=0)), codec.decode
+        yield f"{name}+zstd", (lambda v, n=name: codec.encode(v, codec=n)), codec.decode
+
+
+def run(payloads: dict, number: int, redis_client=None):
+    print(f"{'payload':<12} {'format':<16} {'bytes':>8} {'redis':>8} {'enc µs':>9} {'dec µs':>9}")
+    for label, value in payloads.items():
+        for name, dumps, loads in _variants():
+            data = dumps(value)
+            assert loads(data) == value
+
+            enc = timeit.timeit(lambda: dumps(value), number=number) / number * 1e6
+            dec = timeit.timeit(lambda: loads(data), number=number) / number * 1e6
+
+            stored = "-"
+            if redis_client is not None:
+                key = f"bench:codec:{label}:{name}"
+                redis_client.set(key, data)
+                stored = redis_client.memory_usage(key)
+                redis_client.delete(key)
+
+            print(f"{label:<12} {name:<16} {len(data):>8} {stored:>8} {enc:>9.1f} {dec:>9.1f}")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=10, help="items per search/news payload")
+    parser.add_argument("--number", type=int, default=2000, help="iterations per timing")
+    parser.add_argument("--redis", action="store_true", help="also measure MEMORY USAGE in REDIS_URL")
+    args = parser.parse_args()
+
+    redis_client = None
+    if args.redis:
+        import redis
+        redis_client = redis.Redis.from_url(os.environ["REDIS_URL"])
+
+    payloads = {
+        "web_search": web_search_payload(args.results),
+        "news": news_payload(args.results),
+        "weather": weather_payload(),
+    }
+    run(payloads, args.number, redis_client)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/login.py
+"""
+Login throughput of one API worker: bursts of concurrent password
+verifications run (a) inline on the event loop, as login used to, and
+(b) through the bounded hash pool, for several pool sizes. Alongside
+logins/s it reports event-loop lag (how late a 10ms ticker wakes up),
+i.e. what every other request on the worker waits during the burst.
+
+    python -m benchmarks.login [--logins 48] [--concurrency 16] [--rounds 12] [--workers 1,2,4]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# Placeholder config only; nothing here connects anywhere
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "x")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+from app.core import security
+from app.core.config import get_settings
+
+TICK = 0.01
+
+
+async def _ticker(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def _burst(verify, hashed: str, logins: int, concurrency: int) -> tuple:
+    semaphore = asyncio.Semaphore(concurrency)
+    lags, stop = [], asyncio.Event()
+
+    async def login():
+        async with semaphore:
+            assert await verify("correct horse", hashed)
+
+    ticker = asyncio.create_task(_ticker(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0
+    return logins / elapsed, statistics.median(lags) if lags else 0.0, p99
+
+
+def _configure(rounds: int, workers: int):
+    os.environ["BCRYPT_ROUNDS"] = str(rounds)
+    os.environ["PASSWORD_HASH_WORKERS"] = str(workers)
+    get_settings.cache_clear()
+    security.get_pwd_context.cache_clear()
+    security.shutdown_hash_pool()
+
+
+async def main(args):
+    _configure(args.rounds, 1)
+    hashed = security.hash_password("correct horse")
+
+    async def inline(password, hashed):
+        return security.verify_password(password, hashed)
+
+    print(f"bcrypt rounds={args.rounds}, {args.logins} logins, concurrency {args.concurrency}, {os.cpu_count()} CPUs\n")
+    print(f"{'mode':<12} {'logins/s':>9} {'loop lag p50':>13} {'loop lag p99':>13}")
+
+    runs = [("inline", 1, inline)] + [(f"pool x{w}", w, security.averify_password) for w in args.workers]
+    for name, workers, verify in runs:
+        _configure(args.rounds, workers)
+        rate, p50, p99 = await _burst(verify, hashed, args.logins, args.concurrency)
+        print(f"{name:<12} {rate:>9.1f} {p50 * 1000:>11.1f}ms {p99 * 1000:>11.1f}ms")
+
+    security.shutdown_hash_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=48)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=lambda s: [int(w) for w in s.split(",")], default=[1, 2, 4])
+    asyncio.run(main(parser.parse_args()))
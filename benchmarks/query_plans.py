@@ -0,0 +1,125 @@
+# benchmarks/query_plans.py
+"""
+Query-plan regression check for the hot read paths (history pages and
+the session list). Migrates and seeds a database, EXPLAINs the exact
+statements the routes run, and exits non-zero if one of them stops
+using its composite index or needs a sort / full table scan.
+
+    python -m benchmarks.query_plans                      # temporary SQLite file
+    python -m benchmarks.query_plans --database-url postgresql://...
+
+Use a throwaway database: the seed data is added to whatever is there.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+# Must be set before the settings are first read
+if __name__ == "__main__":
+    _parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _parser.add_argument("--database-url", help="default: a temporary SQLite file")
+    _parser.add_argument("--users", type=int, default=20)
+    _parser.add_argument("--sessions", type=int, default=20, help="per user")
+    _parser.add_argument("--messages", type=int, default=40, help="per session")
+    ARGS = _parser.parse_args()
+    os.environ["DATABASE_URL"] = ARGS.database_url or f"sqlite:///{tempfile.mkdtemp()}/plans.db"
+    os.environ.setdefault("SECRET_KEY", "x")
+    os.environ.setdefault("ALGORITHM", "HS256")
+
+from sqlalchemy import insert, select, func, text
+
+from app.api.session_routes import message_page_query, session_page_query
+from app.db.migrate import migrate
+from app.db.session import get_engine
+from app.models import Message, Session, User
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+# Plan fragments that mean the query no longer walks its index in order
+FORBIDDEN = {
+    "sqlite": ("USE TEMP B-TREE", "SCAN messages", "SCAN sessions"),
+    "postgresql": ("Seq Scan", "Sort"),
+}
+
+
+def _checks(user_id: int, session_id: int) -> list:
+    cursor = (START + timedelta(days=1), 10**9)
+    return [
+        ("message page", message_page_query(session_id, 51), ["ix_messages_session_created"]),
+        ("message page (cursor)", message_page_query(session_id, 51, cursor), ["ix_messages_session_created"]),
+        ("session page", session_page_query(user_id, 21), ["ix_sessions_user_created", "ix_messages_session_created"]),
+        ("session page (cursor)", session_page_query(user_id, 21, cursor), ["ix_sessions_user_created", "ix_messages_session_created"]),
+    ]
+
+
+async def seed(conn, users: int, sessions: int, messages: int):
+    first_user = (await conn.scalar(select(func.max(User.id)))) or 0
+    first_session = (await conn.scalar(select(func.max(Session.id)))) or 0
+
+    await conn.execute(insert(User), [
+        {"id": first_user + u, "fullname": f"user {u}", "email": f"plans-{first_user + u}@example.com", "password_hash": "x"}
+        for u in range(1, users + 1)
+    ])
+
+    session_rows, message_rows = [], []
+    for u in range(1, users + 1):
+        for s in range(sessions):
+            session_id = first_session + len(session_rows) + 1
+            session_rows.append({
+                "id": session_id, "user_id": first_user + u, "title": f"session {s}", "status": "active",
+                "created_at": START + timedelta(minutes=len(session_rows)),
+            })
+            message_rows += [
+                {"session_id": session_id, "sender": "user" if m % 2 == 0 else "assistant",
+                 "content": f"message {m}", "created_at": START + timedelta(seconds=len(message_rows) + m)}
+                for m in range(messages)
+            ]
+
+    await conn.execute(insert(Session), session_rows)
+    await conn.execute(insert(Message), message_rows)
+    return first_user + 1, first_session + 1
+
+
+async def explain(conn, statement) -> str:
+    compiled = statement.compile(dialect=conn.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup or ())
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+
+    rows = (await conn.exec_driver_sql(prefix + str(compiled), params)).all()
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+async def main(args) -> int:
+    await migrate()
+    engine = get_engine()
+
+    async with engine.begin() as conn:
+        user_id, session_id = await seed(conn, args.users, args.sessions, args.messages)
+        await conn.execute(text("ANALYZE"))
+
+    failures = 0
+    async with engine.connect() as conn:
+        dialect = conn.dialect.name
+        if dialect == "postgresql":
+            # Tiny seeded tables would otherwise be seq-scanned by design
+            await conn.execute(text("SET enable_seqscan = off"))
+
+        for name, statement, indexes in _checks(user_id, session_id):
+            plan = await explain(conn, statement)
+            problems = [f"missing {ix}" for ix in indexes if ix not in plan]
+            problems += [f"has {frag!r}" for frag in FORBIDDEN.get(dialect, ()) if frag in plan]
+
+            print(f"{'FAIL' if problems else 'ok':<5} {name}" + (f": {', '.join(problems)}" if problems else ""))
+            if problems:
+                print("      " + plan.replace("\n", "\n      "))
+            failures += bool(problems)
+
+    await engine.dispose()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(ARGS)))
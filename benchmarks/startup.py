@@ -0,0 +1,86 @@
+# benchmarks/startup.py
+"""
+Cold-start latency of the API process: time to `import app.main` (which
+builds the FastAPI app) in fresh interpreters, plus the one-off cost of
+the lazily built pieces on first use.
+
+    python -m benchmarks.startup [--runs 5] [--top 15]
+
+Runs without any environment configured, which also checks that
+importing the app doesn't need DATABASE_URL / GROQ_API_KEY / Redis.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_APP = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+# Placeholder config only; nothing here connects anywhere
+FIRST_USE = """
+import os, time
+os.environ.update(DATABASE_URL="sqlite://", SECRET_KEY="x", ALGORITHM="HS256",
+                  REDIS_URL="redis://localhost:6379/0", GROQ_API_KEY="x")
+import app.main
+from app.tools.registry import get_tools
+from app.agents.multi_agent_graph import get_llm, get_multi_agent_app
+for name, fn in (("tools", get_tools), ("llm", get_llm), ("graph", get_multi_agent_app)):
+    t = time.perf_counter(); fn(); print(name, time.perf_counter() - t)
+"""
+
+
+def _env() -> dict:
+    # Minimal environment: no app settings, no .env overrides
+    return {"PATH": os.environ.get("PATH", ""), "PYTHONPATH": ROOT, "PYTHONWARNINGS": "ignore"}
+
+
+def _python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=os.path.join(ROOT, "benchmarks"),  # keep the repo's .env out of reach
+        env=_env(), capture_output=True, text=True, check=True,
+    )
+
+
+def import_times(runs: int) -> list:
+    return [float(_python(IMPORT_APP).stdout.strip()) for _ in range(runs)]
+
+
+def slowest_imports(top: int) -> list:
+    """
+    (cumulative µs, module) of the heaviest imports, from -X importtime.
+    """
+    rows = []
+    for line in _python("import app.main", "-X", "importtime").stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), module.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="heaviest imports to list")
+    args = parser.parse_args()
+
+    times = import_times(args.runs)
+    print(f"import app.main: median {statistics.median(times) * 1000:.0f} ms "
+          f"(min {min(times) * 1000:.0f}, max {max(times) * 1000:.0f}, runs {args.runs})")
+
+    print("\nfirst use (lazy init):")
+    for line in _python(FIRST_USE).stdout.splitlines():
+        name, seconds = line.split()
+        print(f"  {name:<6} {float(seconds) * 1000:8.0f} ms")
+
+    print("\nheaviest imports (cumulative):")
+    for cumulative, module in slowest_imports(args.top):
+        print(f"  {cumulative / 1000:8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
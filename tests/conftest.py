@@ -0,0 +1,29 @@
+# tests/conftest.py
+import os
+
+# Placeholder config, set before the settings are first read
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+
+import fakeredis
+import pytest
+
+from app.core import redis_client
+
+
+@pytest.fixture
+def fake_redis():
+    """
+    In-memory Redis behind every client getter (sync, async, raw).
+    """
+    server = fakeredis.FakeServer()
+    redis_client._clients.update({
+        "sync": fakeredis.FakeRedis(server=server, decode_responses=True),
+        "sync_raw": fakeredis.FakeRedis(server=server),
+        "async": fakeredis.FakeAsyncRedis(server=server, decode_responses=True),
+        "async_raw": fakeredis.FakeAsyncRedis(server=server),
+    })
+    yield server
+    redis_client._clients.clear()
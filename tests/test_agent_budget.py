@@ -0,0 +1,69 @@
+# tests/test_agent_budget.py
+import asyncio
+import itertools
+
+from langchain_core.messages import AIMessage, SystemMessage, ToolMessage
+
+from app.agents import multi_agent_graph
+from app.services import agent_service
+
+
+class FakeLLM:
+    """
+    Stands in for the tool-bound chat model. Rejects prompts with
+    unanswered tool calls the way the provider API does; the executor
+    always asks for a tool, every other agent answers in text.
+    """
+
+    def __init__(self):
+        self.ids = itertools.count()
+
+    async def ainvoke(self, prompt):
+        pending = set()
+        for msg in prompt:
+            if isinstance(msg, ToolMessage):
+                pending.discard(msg.tool_call_id)
+            elif pending:
+                raise ValueError(f"tool calls without results: {sorted(pending)}")
+            if isinstance(msg, AIMessage):
+                pending = {call["id"] for call in msg.tool_calls}
+
+        if "You are Astra-EXECUTOR" in prompt[0].content:
+            call = {"name": "web_search", "args": {"query": "q"}, "id": f"call_{next(self.ids)}"}
+            return AIMessage(content="", tool_calls=[call])
+        return AIMessage(content="answer")
+
+
+def _dangling_tool_calls(messages):
+    answered = {m.tool_call_id for m in messages if isinstance(m, ToolMessage)}
+    return [
+        call["id"]
+        for m in messages if isinstance(m, AIMessage)
+        for call in m.tool_calls if call["id"] not in answered
+    ]
+
+
+def test_exhausted_budget_leaves_a_valid_thread(fake_redis, monkeypatch):
+    monkeypatch.setattr(multi_agent_graph, "get_llm", FakeLLM)
+    multi_agent_graph.get_multi_agent_app.cache_clear()
+
+    async def run():
+        # No tool hops allowed: the executor's call is skipped, twice
+        for question in ("what happened today?", "and yesterday?"):
+            reply, _, tool_runs = await agent_service.run_multi_agent(
+                1, question, budget={"max_tool_hops": 0}, use_cache=False
+            )
+            assert reply == "answer"
+            assert [run["result"] for run in tool_runs] == ["skipped: tool hop limit reached (0)"]
+
+        config = agent_service.thread_config(1)
+        return (await multi_agent_graph.get_multi_agent_app().aget_state(config)).values["messages"]
+
+    try:
+        messages = asyncio.run(run())
+    finally:
+        multi_agent_graph.get_multi_agent_app.cache_clear()
+
+    assert _dangling_tool_calls(messages) == []
+    assert not any(isinstance(m, SystemMessage) for m in messages)
+    assert [m.type for m in messages] == ["human", "ai", "ai", "tool", "ai"] * 2
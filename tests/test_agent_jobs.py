@@ -0,0 +1,47 @@
+# tests/test_agent_jobs.py
+import asyncio
+import signal
+
+import pytest
+
+from app.services import agent_jobs
+
+
+class JobTimeout(Exception):
+    pass
+
+
+def test_interrupted_job_does_not_leak_its_task(monkeypatch):
+    steps = []
+
+    async def slow_turn(session_id, content, budget, use_cache):
+        try:
+            steps.append(f"start {content}")
+            await asyncio.sleep(2)
+            steps.append(f"done {content}")
+        except asyncio.CancelledError:
+            steps.append(f"cancelled {content}")
+            raise
+        return {"content": content}
+
+    async def fast_turn(session_id, content, budget, use_cache):
+        await asyncio.sleep(0.3)
+        return {"content": content}
+
+    def on_alarm(signum, frame):
+        raise JobTimeout()
+
+    monkeypatch.setattr(agent_jobs, "_run_turn", slow_turn)
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    try:
+        # Same mechanism as rq's job_timeout in a SimpleWorker
+        signal.setitimer(signal.ITIMER_REAL, 0.1)
+        with pytest.raises(JobTimeout):
+            agent_jobs.run_turn_job(1, "first")
+    finally:
+        signal.signal(signal.SIGALRM, previous)
+
+    # The next job on the same loop must not resume the interrupted turn
+    monkeypatch.setattr(agent_jobs, "_run_turn", fast_turn)
+    assert agent_jobs.run_turn_job(1, "second") == {"content": "second"}
+    assert steps == ["start first", "cancelled first"]
@@ -0,0 +1,52 @@
+# tests/test_checkpointer.py
+import asyncio
+from typing import Annotated, List, TypedDict
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from app.agents.checkpointer import RedisCheckpointSaver
+from app.core.redis_client import get_async_redis_raw_client
+
+
+class State(TypedDict):
+    messages: Annotated[List[BaseMessage], add_messages]
+
+
+async def echo(state: State) -> State:
+    return {"messages": [AIMessage(content=state["messages"][-1].content.upper())]}
+
+
+def _graph(keep: int):
+    graph = StateGraph(State)
+    graph.add_node("echo", echo)
+    graph.add_edge(START, "echo")
+    graph.add_edge("echo", END)
+    return graph.compile(checkpointer=RedisCheckpointSaver(get_async_redis_raw_client(), keep=keep))
+
+
+def test_pruning_drops_unreferenced_blobs(fake_redis):
+    turns, keep = 12, 3
+    config = {"configurable": {"thread_id": "t1"}}
+
+    async def run():
+        app = _graph(keep)
+        for turn in range(turns):
+            await app.ainvoke({"messages": [HumanMessage(content=f"turn {turn}")]}, config)
+
+        redis = get_async_redis_raw_client()
+        blobs = [key async for key in redis.scan_iter(match="ckpt:blob:t1:*")]
+        checkpoints = await redis.zcard("ckpt:idx:t1:")
+        state = await app.aget_state(config)
+        return blobs, checkpoints, state.values["messages"]
+
+    blobs, checkpoints, messages = asyncio.run(run())
+
+    assert checkpoints == keep
+    assert len(messages) == 2 * turns  # history survives pruning
+    assert messages[-1].content == f"TURN {turns - 1}"
+
+    # At most one blob per channel and retained checkpoint
+    channels = {key.decode().split(":")[4] for key in blobs}
+    assert len(blobs) <= len(channels) * keep
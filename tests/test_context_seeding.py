@@ -0,0 +1,58 @@
+# tests/test_context_seeding.py
+import asyncio
+
+from langchain_core.messages import HumanMessage
+
+from app.services import agent_service, context_manager
+
+
+def _history(turns: int):
+    history = []
+    for turn in range(turns):
+        history += [
+            {"role": "user", "content": f"question {turn} " + "word " * 100},
+            {"role": "assistant", "content": f"answer {turn} " + "word " * 100},
+        ]
+    return history
+
+
+def test_seeding_does_not_resummarize_covered_turns(fake_redis, monkeypatch):
+    refreshed = []
+
+    async def refresh_summary(previous, older):
+        refreshed.append(older)
+        return "refreshed"
+
+    async def load_history():
+        return _history(40)
+
+    monkeypatch.setattr(context_manager, "refresh_summary", refresh_summary)
+
+    graph_input, _, window, _ = asyncio.run(
+        agent_service._prepare_turn(7, "next question", "summary of the early turns", load_history)
+    )
+
+    assert refreshed == []
+    assert graph_input["summary"] == "summary of the early turns"
+    assert isinstance(window[0], HumanMessage)
+    assert window[-1].content == "next question"
+    assert window[-2].content.startswith("answer 39 ")
+    assert len(window) < 80
+
+
+def test_seeding_without_summary_summarizes_overflow(fake_redis, monkeypatch):
+    refreshed = []
+
+    async def refresh_summary(previous, older):
+        refreshed.append(older)
+        return "refreshed"
+
+    async def load_history():
+        return _history(40)
+
+    monkeypatch.setattr(context_manager, "refresh_summary", refresh_summary)
+
+    graph_input, _, _, _ = asyncio.run(agent_service._prepare_turn(8, "next question", None, load_history))
+
+    assert len(refreshed) == 1
+    assert graph_input["summary"] == "refreshed"
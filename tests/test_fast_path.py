@@ -0,0 +1,52 @@
+# tests/test_fast_path.py
+import pytest
+
+from app.agents.fast_path import match_fast_path
+
+
+@pytest.mark.parametrize("text, args", [
+    ("convert 100 usd to inr", {"amount": 100.0, "from_currency": "USD", "to_currency": "INR"}),
+    ("How much is 20.5 EUR in GBP?", {"amount": 20.5, "from_currency": "EUR", "to_currency": "GBP"}),
+    ("50jpy into chf", {"amount": 50.0, "from_currency": "JPY", "to_currency": "CHF"}),
+])
+def test_currency_conversions_take_the_fast_path(text, args):
+    call = match_fast_path(text)
+    assert call["name"] == "currency_convert"
+    assert call["args"] == args
+
+
+@pytest.mark.parametrize("text", [
+    "convert 5 km to mil",
+    "10 lbs in kgs",
+    "convert 3 cup to tsp",
+    "how much is 100 abc to xyz",
+    "convert 100 usd to rupees",
+])
+def test_unit_conversions_fall_through(text):
+    assert match_fast_path(text) is None
+
+
+@pytest.mark.parametrize("text, city", [
+    ("weather in new york", "New York"),
+    ("What is the weather like in Paris today?", "Paris"),
+    ("weather at london right now", "London"),
+    ("weather in st. louis", "St. Louis"),
+])
+def test_city_weather_takes_the_fast_path(text, city):
+    call = match_fast_path(text)
+    assert call["name"] == "get_weather"
+    assert call["args"] == {"city": city}
+
+
+@pytest.mark.parametrize("text", [
+    "what is the weather today",
+    "what's the weather like?",
+    "weather in delhi yesterday",
+    "weather in paris in fahrenheit",
+    "weather in delhi and mumbai",
+    "weather in rome tomorrow",
+    "weather for me",
+    "weather here",
+])
+def test_vague_weather_questions_fall_through(text):
+    assert match_fast_path(text) is None
@@ -0,0 +1,56 @@
+# tests/test_pagination.py
+import asyncio
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.session_routes import _message_page, get_user_sessions
+from app.db.session import Base
+from app.models import Message, Session, User
+from app.services.principal_cache import Principal
+
+
+async def _walk(fetch, key):
+    """
+    Follows next_cursor to the end; stops (and fails) on a repeated cursor.
+    """
+    seen, cursors, cursor = [], set(), None
+    while True:
+        page = await fetch(cursor)
+        seen += [row["id"] if isinstance(row, dict) else row.id for row in page[key]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+        assert cursor not in cursors, "pagination loops"
+        cursors.add(cursor)
+
+
+def test_keyset_pages_cover_every_row_once_on_sqlite(tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/pages.db")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                # server_default timestamps: many rows share one second
+                await conn.execute(insert(User), [{"id": 1, "fullname": "u", "email": "u@x.io", "password_hash": "x"}])
+                await conn.execute(insert(Session), [{"id": i, "user_id": 1, "status": "active"} for i in range(1, 24)])
+                await conn.execute(insert(Message), [
+                    {"session_id": 1, "sender": "user", "content": f"m{i}"} for i in range(57)
+                ])
+
+            async with AsyncSession(engine) as db:
+                messages = await _walk(lambda before: _message_page(db, 1, 10, before), "messages")
+                user = Principal(id=1, email="u@x.io", fullname="u")
+                sessions = await _walk(
+                    lambda cursor: get_user_sessions(limit=5, cursor=cursor, db=db, user=user), "sessions"
+                )
+        finally:
+            await engine.dispose()
+        return messages, sessions
+
+    messages, sessions = asyncio.run(run())
+
+    assert sorted(messages) == list(range(1, 58))
+    assert len(set(messages)) == len(messages)
+    assert sorted(sessions) == list(range(1, 24))
+    assert len(set(sessions)) == len(sessions)
@@ -0,0 +1,40 @@
+# tests/test_query_plans.py
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db import session
+from app.db.migrate import migrate
+from benchmarks.query_plans import FORBIDDEN, _checks, explain, seed
+
+
+def test_hot_read_paths_use_their_composite_indexes(tmp_path, monkeypatch):
+    """
+    Same check as `python -m benchmarks.query_plans`, on a migrated SQLite
+    file: fails if a migration stops creating one of the indexes or a
+    query change makes it sort or scan.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/plans.db")
+    monkeypatch.setattr(session, "_engine", engine)
+
+    async def run():
+        try:
+            await migrate()
+            async with engine.begin() as conn:
+                user_id, session_id = await seed(conn, users=5, sessions=10, messages=20)
+                await conn.execute(text("ANALYZE"))
+
+            problems = {}
+            async with engine.connect() as conn:
+                for name, statement, indexes in _checks(user_id, session_id):
+                    plan = await explain(conn, statement)
+                    found = [f"missing {ix}" for ix in indexes if ix not in plan]
+                    found += [f"has {frag!r}" for frag in FORBIDDEN["sqlite"] if frag in plan]
+                    if found:
+                        problems[name] = (found, plan)
+            return problems
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(run()) == {}
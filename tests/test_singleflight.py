@@ -0,0 +1,61 @@
+# tests/test_singleflight.py
+import asyncio
+
+from app.utils.singleflight import SingleFlight
+
+
+def test_cancelled_leader_does_not_fail_followers():
+    calls, flight = [], SingleFlight()
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "value"
+
+    async def run():
+        leader = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0.01)
+
+        leader.cancel()  # e.g. the leader's client disconnected
+        return await follower, leader.cancelled()
+
+    assert asyncio.run(run()) == ("value", True)
+    assert len(calls) == 1
+
+
+def test_call_is_cancelled_when_every_caller_is_gone():
+    steps, flight = [], SingleFlight()
+
+    async def fetch():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            steps.append("cancelled")
+            raise
+
+    async def run():
+        callers = [asyncio.create_task(flight.do("k", fetch)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        return flight._inflight
+
+    assert asyncio.run(run()) == {}
+    assert steps == ["cancelled"]
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", fetch) for _ in range(3)), return_exceptions=True)
+
+    assert [type(r) for r in asyncio.run(run())] == [ValueError] * 3
@@ -0,0 +1,68 @@
+# tests/test_tool_breaker.py
+import asyncio
+import time
+
+import httpx
+
+from app.core.deadline import DeadlineExceeded, deadline_scope
+from app.tools.registry import _guarded
+from app.utils.circuit_breaker import CircuitBreaker, OPEN, CLOSED
+
+
+def _failing_tool(error: Exception):
+    async def tool():
+        raise error
+    return tool
+
+
+def _run(name: str, error: Exception, calls: int, deadline: float | None = None):
+    async def run():
+        tool = _guarded(name, _failing_tool(error))
+        with deadline_scope(deadline):
+            results = [await tool() for _ in range(calls)]
+        return results, await CircuitBreaker(name).status()
+
+    return asyncio.run(run())
+
+
+def test_bad_input_does_not_open_the_breaker(fake_redis):
+    results, status = _run("bad_input", ValueError("Unsupported currency: XYZ"), 10)
+
+    assert results[-1] == {"error": "Unsupported currency: XYZ"}
+    assert status["state"] == CLOSED
+    assert status["recent_failures"] == 0
+
+
+def test_client_errors_do_not_open_the_breaker(fake_redis):
+    request = httpx.Request("GET", "https://example.com")
+    error = httpx.HTTPStatusError("not found", request=request, response=httpx.Response(404, request=request))
+
+    _, status = _run("not_found", error, 10)
+    assert status["state"] == CLOSED
+
+
+def test_upstream_failures_open_the_breaker(fake_redis):
+    request = httpx.Request("GET", "https://example.com")
+    error = httpx.HTTPStatusError("unavailable", request=request, response=httpx.Response(503, request=request))
+
+    results, status = _run("unavailable", error, 6)
+    assert status["state"] == OPEN
+    assert "temporarily unavailable" in results[-1]["error"]
+
+    _, status = _run("unreachable", httpx.ConnectError("connection refused"), 6)
+    assert status["state"] == OPEN
+
+
+def test_timeouts_cut_short_by_the_run_deadline_do_not_open_the_breaker(fake_redis):
+    results, status = _run("late", DeadlineExceeded("Deadline exceeded before the request was sent"), 10)
+    assert status["state"] == CLOSED
+
+    results, status = _run("short", httpx.ConnectTimeout(""), 10, deadline=time.time() + 5)
+    assert status["state"] == CLOSED
+    assert status["recent_failures"] == 0
+    assert results[-1] == {"error": "ConnectTimeout"}
+
+
+def test_timeouts_with_the_full_tool_timeout_open_the_breaker(fake_redis):
+    results, status = _run("slow", httpx.ReadTimeout(""), 6)
+    assert status["state"] == OPEN
@@ -0,0 +1,32 @@
+# tests/test_tool_registry.py
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.agents import multi_agent_graph
+from app.tools.registry import TOOLS_REGISTRY, describe_tools
+
+
+def test_every_registered_tool_is_described():
+    described = describe_tools()
+
+    for name in TOOLS_REGISTRY:
+        assert f". {name}(" in described
+    assert "conversions: List[Conversion]" in described
+
+
+@pytest.mark.parametrize("node", [multi_agent_graph.planner_node, multi_agent_graph.executor_node])
+def test_agent_prompts_list_the_registry(node, monkeypatch):
+    prompts = []
+
+    async def invoke_llm(prompt):
+        prompts.append(prompt)
+        return AIMessage(content="ok")
+
+    monkeypatch.setattr(multi_agent_graph, "_invoke_llm", invoke_llm)
+    asyncio.run(node({"messages": [HumanMessage(content="weather in Paris and Rome?")]}))
+
+    system = prompts[0][0].content
+    assert describe_tools(indent=16 * " ") in system
+    assert "get_weather_batch(" in system
@@ -0,0 +1,112 @@
+# tests/test_turn_rollback.py
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+
+from app.agents import multi_agent_graph
+from app.core.config import get_settings
+from app.services import agent_service, context_manager
+
+SESSION_ID = 3
+
+
+class FlakyLLM:
+    """
+    Answers in text, asks for a (hanging) tool when `tool` is set and
+    raises when `fail` is set, like a provider outage.
+    """
+    fail = False
+    tool = False
+
+    async def ainvoke(self, prompt):
+        if self.fail:
+            raise RuntimeError("LLM unavailable")
+        if self.tool and "You are Astra-EXECUTOR" in prompt[0].content:
+            call = {"name": "web_search", "args": {"query": "q"}, "id": "call_hang"}
+            return AIMessage(content="", tool_calls=[call])
+        return AIMessage(content="ok")
+
+
+class HangingTool:
+    async def ainvoke(self, args):
+        await asyncio.sleep(60)
+
+
+@pytest.fixture
+def agents(fake_redis, monkeypatch):
+    llm = FlakyLLM()
+    summaries = iter(f"S{n}" for n in range(1, 100))
+
+    async def refresh_summary(previous, older):
+        return next(summaries)
+
+    monkeypatch.setattr(multi_agent_graph, "get_llm", lambda: llm)
+    monkeypatch.setattr(multi_agent_graph, "get_tool", lambda name: HangingTool())
+    monkeypatch.setattr(context_manager, "refresh_summary", refresh_summary)
+    monkeypatch.setenv("CONTEXT_TOKEN_BUDGET", "60")
+    get_settings.cache_clear()
+    multi_agent_graph.get_multi_agent_app.cache_clear()
+    yield llm
+    get_settings.cache_clear()
+    multi_agent_graph.get_multi_agent_app.cache_clear()
+
+
+def _turn(number: int, db_summary: str | None):
+    question = f"question {number} " + "word " * 30
+    return agent_service.run_multi_agent(SESSION_ID, question, db_summary, use_cache=False)
+
+
+async def _thread():
+    state = await multi_agent_graph.get_multi_agent_app().aget_state(agent_service.thread_config(SESSION_ID))
+    return [(m.type, m.content) for m in state.values["messages"]], state.values.get("summary")
+
+
+def test_failed_turn_leaves_the_thread_as_it_was(agents):
+    async def run():
+        _, summary, _ = await _turn(1, None)
+        _, summary, _ = await _turn(2, summary)
+        before = await _thread()
+
+        agents.fail = True
+        with pytest.raises(RuntimeError):
+            await _turn(3, summary)
+        after_failure = await _thread()
+
+        # The DB still holds the summary of an older turn
+        agents.fail = False
+        _, summary_4, _ = await _turn(4, "S0")
+        return before, after_failure, summary_4
+
+    before, after_failure, summary_4 = asyncio.run(run())
+
+    assert before[1] is not None  # turn 2 evicted turn 1 into the summary
+    assert after_failure == before
+    assert summary_4 != "S0"
+
+
+def test_cancelled_tool_call_leaves_no_dangling_call(agents):
+    async def run():
+        await _turn(1, None)
+        before = await _thread()
+
+        agents.tool = True
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(_turn(2, None), 0.5)  # e.g. the job timeout
+        return before, await _thread()
+
+    before, after = asyncio.run(run())
+
+    assert after == before
+    assert not any(t == "tool" for t, _ in after[0])
+
+
+def test_failed_first_turn_drops_the_seeded_thread(agents):
+    async def run():
+        agents.fail = True
+        with pytest.raises(RuntimeError):
+            await _turn(1, None)
+        state = await multi_agent_graph.get_multi_agent_app().aget_state(agent_service.thread_config(SESSION_ID))
+        return state.values
+
+    assert asyncio.run(run()) == {}
@@ -0,0 +1,30 @@
+# tests/test_weather_aliases.py
+import asyncio
+
+from app.tools import weather
+
+
+def test_aliases_expire_and_are_shared(fake_redis, monkeypatch):
+    calls = []
+
+    async def fetch(url, params=None):
+        calls.append(url)
+        return {
+            "current_condition": [{"temp_C": "21", "weatherDesc": [{"value": "Sunny"}], "humidity": "40"}],
+            "nearest_area": [{"areaName": [{"value": "Sao Paulo"}], "country": [{"value": "Brazil"}]}],
+        }
+
+    monkeypatch.setattr(weather, "aget_json", fetch)
+    monkeypatch.setattr(weather, "_aliases", weather.LocalTTLCache())
+
+    async def run():
+        first = await weather.city_weather("São Paulo")
+        second = await weather.city_weather("SAO PAULO")
+        redis = weather.get_async_redis_client()
+        return first, second, await redis.ttl(weather.ALIAS_KEY.format("sao paulo"))
+
+    first, second, ttl = asyncio.run(run())
+
+    assert first == second
+    assert len(calls) == 1
+    assert 0 < ttl <= weather.ALIAS_TTL